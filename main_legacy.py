@@ -12,7 +12,7 @@ src_path = os.path.join(project_root, "src")
 sys.path.append(project_root)
 sys.path.append(src_path)
 
-from src.model_service.model_service import TravelAutomationSystem
+from src.model_service.model_service import get_trip_system
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from src.api_manager.connection_manager import ConnectionManager
 
@@ -22,7 +22,7 @@ app = FastAPI()
 manager = ConnectionManager()
 
 print("🚀 Initializing AI Travel System...")
-trip_system = TravelAutomationSystem() # initialized ONCE
+trip_system = get_trip_system() # initialized ONCE
 print("✅ System Ready.")
 
 async def heartbeat(user_id):
@@ -1,20 +1,15 @@
 # Libraries
-from langchain.agents import create_agent
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-from src.tools.attraction_finding_tool import attraction_finding_tool
-from src.tools.hotel_tool import hotel_finding_tool
-from src.tools.restaurant_tool import restaurant_finding_tool
+import json
 
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, max_retries = 3, timeout=90)
-checkpointer = InMemorySaver()
-tools = [attraction_finding_tool, hotel_finding_tool, restaurant_finding_tool]
+from langchain.agents import create_agent
+from langchain_core.messages import HumanMessage, SystemMessage
 
 class DestinationInfoAgent:
     def __init__(self, model, tools):
 
         prompt = self.prompt_initialize()
+        self.model = model
+        self.prompt = prompt
         self.agent = self.agent_intialize(model, tools, prompt)
 
     def prompt_initialize(self) -> str:
@@ -25,12 +20,14 @@ class DestinationInfoAgent:
                     - attraction_finding_tool(place_name): Top 5 attractions
                     - hotel_finding_tool(place_name): Top 5 hotels
                     - restaurant_finding_tool(place_name): Top 5 restaurants
+                    - city_profile_tool(place_names): All three categories for a list of cities in one call
 
                     USAGE:
                     - "things to do" → attractions
                     - "where to stay" → hotels
                     - "where to eat" → restaurants
-                    - General city query → use all 3 tools
+                    - General city query → use city_profile_tool with every city at once
+                    - If the message already contains a "CITY PROFILE DATA" block, use that data directly (report failed lookups as errors)
 
                     RULES:
                     1. Only use tool outputs, never fabricate data
@@ -67,4 +64,35 @@ class DestinationInfoAgent:
         res = self.agent.invoke(user_input)
         
         # Return the last message (the AI's response)
-        return res
\ No newline at end of file
+        return res
+
+    def summarize(self, destinations, duration, profiles: dict) -> str:
+        """
+        Summarize pre-fetched city profiles with a single model call.
+        No tools are bound, so there is no tool-planning round trip.
+        """
+        response = self.model.invoke(self._summary_messages(destinations, duration, profiles))
+        return self._message_text(response)
+
+    async def asummarize(self, destinations, duration, profiles: dict) -> str:
+        response = await self.model.ainvoke(self._summary_messages(destinations, duration, profiles))
+        return self._message_text(response)
+
+    def _summary_messages(self, destinations, duration, profiles: dict):
+        prompt = (
+            f"I'm going to {destinations} for {duration} days.\n\n"
+            f"CITY PROFILE DATA:\n{json.dumps(profiles, ensure_ascii=False)}"
+        )
+        return [SystemMessage(content=self.prompt), HumanMessage(content=prompt)]
+
+    def _message_text(self, message) -> str:
+        content = message.content
+        if isinstance(content, list):
+            return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return content
+
+    async def ainvoke(self, user_input: str):
+        """
+        Async counterpart of invoke, so tool calls run on the caller's event loop.
+        """
+        return await self.agent.ainvoke(user_input)
@@ -1,10 +1,9 @@
 # Libraries
+import inspect
 
 from langchain.agents import create_agent
+from langchain_core.messages import AIMessageChunk
 
-from src.prompts.final_trip_planner_prompts import main_agent_system_prompt
-from src.tools.distance_measurement_tool import distance_measurement_tool
-from src.tools.web_search_tool import web_search_tool
 # from src.middlewares.final_trip_planner_middlewares import switch_system_prompt
 
 class FinalTripPlanner:
@@ -29,4 +28,53 @@ class FinalTripPlanner:
         res = self.agent.invoke(user_input)
         
         # Return the last message (the AI's response)
-        return res
\ No newline at end of file
+        return res
+
+    async def ainvoke(self, user_input: str):
+        """
+        Async counterpart of invoke, so tool calls run on the caller's event loop.
+        """
+        return await self.agent.ainvoke(user_input)
+
+    def stream(self, user_input: str, on_token):
+        """
+        Same as invoke, but every text token of the model's answer is passed to
+        on_token(text) as soon as it arrives. Returns the final agent state.
+        """
+        final_state = None
+        for mode, data in self.agent.stream(user_input, stream_mode=["messages", "values"]):
+            if mode == "values":
+                final_state = data
+                continue
+            text = self._token_text(*data)
+            if text:
+                on_token(text)
+        return final_state
+
+    async def astream(self, user_input: str, on_token):
+        """
+        Async counterpart of stream. on_token may be a coroutine function; it is
+        awaited so chunks reach the client in order.
+        """
+        final_state = None
+        async for mode, data in self.agent.astream(user_input, stream_mode=["messages", "values"]):
+            if mode == "values":
+                final_state = data
+                continue
+            text = self._token_text(*data)
+            if text:
+                result = on_token(text)
+                if inspect.isawaitable(result):
+                    await result
+        return final_state
+
+    def _token_text(self, chunk, metadata) -> str:
+        # Only the model's own text: skip tool results and tool-call argument chunks
+        if not isinstance(chunk, AIMessageChunk) or metadata.get("langgraph_node") != "model":
+            return ""
+        if chunk.tool_call_chunks:
+            return ""
+        content = chunk.content
+        if isinstance(content, list):
+            return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return content or ""
@@ -1,18 +1,15 @@
 # Libraries
+import json
 
 from langchain.agents import create_agent
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-from src.tools.flight_search_tool import One_way_flight_search
-
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, max_retries = 3, timeout=90)
-checkpointer = InMemorySaver()
+from langchain_core.messages import HumanMessage, SystemMessage
 
 class FlightSpecialistAgent:
     def __init__(self, model, flight_tool):
 
         prompt = self.prompt_initialize()
+        self.model = model
+        self.prompt = prompt
         self.agent = self.agent_intialize(model, flight_tool, prompt)
 
     def prompt_initialize(self) -> str:
@@ -21,9 +18,11 @@ class FlightSpecialistAgent:
 
         TOOLS:
         - One_way_flight_search(departure_id, arrival_id, travel_date): Searches for flights.
+        - multi_city_flight_search(departure_id, arrival_ids, travel_date): Searches every leg of a multi-city trip in one call.
         Thinking and Action:
             - iF THERE ARE MULTIPLE CITIES IN DESTINATION, THEN YOU HAVE TO FIND THE FLIGHTS FROM DEPARTURE TO ALL DESTINATION AND THEN ALL COMBINATIONS BETWEEN DESTINATIONS AS WELL.
                 EXAMPLE: Departure Taiyuan, Destination: [Islamabad, Karachi]. -> TAIYUAN -> iSLAMABAD, Taiyuan -> Karachi, Islamabad -> Karachi, -> Karachi-> Islamabad.
+                Use ONE multi_city_flight_search call with all destination codes; it computes and searches all these legs for you.
                 Finally make a report where tell all options.
 
         CRITICAL INPUT RULES:
@@ -61,4 +60,35 @@ class FlightSpecialistAgent:
         res = self.agent.invoke(user_input)
         
         # Return the last message (the AI's response)
-        return res
\ No newline at end of file
+        return res
+
+    def summarize(self, flight_results: dict) -> str:
+        """
+        Write the flight report from results that were already fetched
+        (single model call, no tools bound).
+        """
+        response = self.model.invoke(self._summary_messages(flight_results))
+        return self._message_text(response)
+
+    async def asummarize(self, flight_results: dict) -> str:
+        response = await self.model.ainvoke(self._summary_messages(flight_results))
+        return self._message_text(response)
+
+    def _summary_messages(self, flight_results: dict):
+        prompt = (
+            "The flight searches have already been run. Write the report from this data only.\n\n"
+            f"FLIGHT SEARCH DATA:\n{json.dumps(flight_results, ensure_ascii=False)}"
+        )
+        return [SystemMessage(content=self.prompt), HumanMessage(content=prompt)]
+
+    def _message_text(self, message) -> str:
+        content = message.content
+        if isinstance(content, list):
+            return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return content
+
+    async def ainvoke(self, user_input: str):
+        """
+        Async counterpart of invoke, so tool calls run on the caller's event loop.
+        """
+        return await self.agent.ainvoke(user_input)
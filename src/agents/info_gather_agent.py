@@ -1,26 +1,10 @@
-import os
-   
 from langchain.agents import create_agent
-from langgraph.checkpoint.memory import InMemorySaver
 from typing import List
 from pydantic import BaseModel, Field
 
-from src.config.settings import settings
-from src.database.local_database import StoreMemory
 from src.utils.helping_class.trip_requirements import TripRequirement
-from src.tools.time_gather_tool import time_tool
 from src.utils.helping_class.conversation_format import ConversationFormat
 
-# API and environments
-os.environ["GPLACES_API_KEY"] = settings.google_places_key
-os.environ["GOOGLE_API_KEY"] = settings.google_api_key
-os.environ["TAVILY_API_KEY"] = settings.tavily_api_key
-os.environ["http_proxy"] = settings.http_proxy
-os.environ["https_proxy"] = settings.https_proxy
-
-checkpointer = InMemorySaver()
-local_database = StoreMemory()
-
 class ConversationFormat(BaseModel):
     Departure: str = None
     Destination: List['str'] = Field(None, description = "The place you want to go")
@@ -59,9 +43,21 @@ class InformationGatherChatbot():
         return conversation_system_prompt
     def ask(self, question: str, missing_list) -> str:
 
-        modified_input = f" User Input: {question},  Remaining Information: {missing_list} "
+        modified_input = self._format_input(question, missing_list)
         print(modified_input)
         response = self.agent.invoke({"messages":[{"role": "user", "content": modified_input}]})
+        return self._format_response(response)
+
+    async def aask(self, question: str, missing_list) -> str:
+        modified_input = self._format_input(question, missing_list)
+        print(modified_input)
+        response = await self.agent.ainvoke({"messages":[{"role": "user", "content": modified_input}]})
+        return self._format_response(response)
+
+    def _format_input(self, question: str, missing_list) -> str:
+        return f" User Input: {question},  Remaining Information: {missing_list} "
+
+    def _format_response(self, response) -> dict:
         return {
             "Departure": response.get("structured_response").Departure,
             "Destination": response.get("structured_response").Destination,
@@ -71,4 +67,4 @@ class InformationGatherChatbot():
             "Interest": response.get("structured_response").Interest,
             "Response": response.get("structured_response").Response,
             "ExtraDetail": response.get("structured_response").ExtraDetail
-        }
\ No newline at end of file
+        }
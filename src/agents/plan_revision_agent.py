@@ -0,0 +1,45 @@
+# Libraries
+from langchain_core.messages import HumanMessage, SystemMessage
+
+
+class PlanRevisionAgent:
+    """
+    Rewrites only the itinerary sections a revision concern touches
+    (single model call, no tools bound). The sections come back between
+    "=== SECTION <id> ===" markers so they can be spliced into the plan.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.prompt = self.prompt_initialize()
+
+    def prompt_initialize(self) -> str:
+        return """You are the **Travel Plan Optimizer**. You apply a user's change request to specific sections of an existing itinerary.
+
+        RULES:
+        - Rewrite ONLY the sections you are given. Keep their Markdown layout, headings and bullet style exactly.
+        - Change only what the concern asks for; copy every other line of the section unchanged.
+        - Use specific place names from the AVAILABLE PLACES data when you need a replacement.
+        - Do not reuse places listed under USED ELSEWHERE.
+        - Omit distance lines for new places (they cannot be measured here).
+
+        OUTPUT FORMAT:
+        For every section, output the marker line "=== SECTION <id> ===" followed by the rewritten section.
+        Output nothing else: no introduction, no explanation.
+        """
+
+    def revise(self, prompt: str) -> str:
+        response = self.model.invoke(self._messages(prompt))
+        return self._message_text(response)
+
+    async def arevise(self, prompt: str) -> str:
+        response = await self.model.ainvoke(self._messages(prompt))
+        return self._message_text(response)
+
+    def _messages(self, prompt: str):
+        return [SystemMessage(content=self.prompt), HumanMessage(content=prompt)]
+
+    def _message_text(self, message) -> str:
+        content = message.content
+        if isinstance(content, list):
+            return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return content
@@ -1,11 +1,12 @@
 import json
 import asyncio
 import websockets
-from src.model_service.model_service import TravelAutomationSystem
+from src.model_service.model_service import get_trip_system
+from src.api_manager.request_scheduler import request_scheduler, SchedulerFullError
 
 # Initialize system once
 print("🚀 Initializing AI Travel System...")
-trip_system = TravelAutomationSystem()
+trip_system = get_trip_system()
 print("✅ System Ready.")
 
 HEARTBEAT_INTERVAL = 5
@@ -43,6 +44,7 @@ async def client_handler(websocket):
     print(f"🔌 New connection: {websocket.remote_address}")
     heartbeat_task = asyncio.create_task(send_heartbeat())
 
+    user_ids = set()
     try:
         async for data in websocket:
             try:
@@ -50,29 +52,45 @@ async def client_handler(websocket):
                 user_input = message.get("input")
                 # Use a consistent ID so the AI remembers context
                 user_id = message.get("user_id", "default_user") 
+                user_ids.add(user_id)
 
                 print(f"📩 Request from {user_id}: {user_input}")
 
                 # --- Callback for AI Updates ---
                 def status_callback(msg_text: str):
-                    # Schedule the safe_send on the main loop
+                    # Schedule the safe_send on the main loop (safe from nodes and tool threads alike)
                     asyncio.run_coroutine_threadsafe(
                         safe_send({"type": "UPDATE", "content": msg_text}), 
                         loop
                     )
 
-                # --- Run AI (Non-Blocking) ---
-                ai_response = await asyncio.to_thread(
-                    trip_system.run_trip_planner,
-                    user_id=user_id,
-                    user_input=user_input,
-                    on_update=status_callback
+                # --- Callback for Itinerary Tokens ---
+                async def token_callback(token: str):
+                    # Awaited by the planner, so chunks go out in order and before RESPONSE
+                    await safe_send({"type": "CHUNK", "content": token})
+
+                # --- Queue Position Updates ---
+                async def position_callback(position: int):
+                    await safe_send({"type": "UPDATE", "content": f"⏳ You are number {position} in the queue..."})
+
+                # --- Run AI (Non-Blocking, on this event loop, through the scheduler) ---
+                ai_response = await request_scheduler.run(
+                    user_id,
+                    lambda: trip_system.arun_trip_planner(
+                        user_id=user_id,
+                        user_input=user_input,
+                        on_update=status_callback,
+                        on_token=token_callback
+                    ),
+                    on_position=position_callback
                 )
 
-                # Send Final Response
+                # Send Final Response (the complete text, also after streamed CHUNKs)
                 await safe_send({"type": "RESPONSE", "content": ai_response})
                 await safe_send({"type": "DONE"})
 
+            except SchedulerFullError as e:
+                await safe_send({"type": "ERROR", "content": str(e)})
             except json.JSONDecodeError:
                 await safe_send({"type": "ERROR", "content": "Invalid JSON"})
             except Exception as e:
@@ -85,4 +103,7 @@ async def client_handler(websocket):
         print(f"⚠️ Critical Error: {str(e)}")
     finally:
         heartbeat_task.cancel()
+        # Nothing will consume this connection's speculative fetches any more
+        for user_id in user_ids:
+            trip_system.prefetcher.discard(user_id)
         print(f"🛑 Handler finished for {websocket.remote_address}")
\ No newline at end of file
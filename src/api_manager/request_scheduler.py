@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+from collections import deque
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+
+class SchedulerFullError(Exception):
+    """Raised when a request cannot be queued (global or per-user queue is full)."""
+
+
+class _Ticket:
+    def __init__(self, user_id: str, on_position):
+        self.user_id = user_id
+        self.on_position = on_position
+        self.started = asyncio.get_running_loop().create_future()
+        self.last_position = None
+
+
+class RequestScheduler:
+    """
+    Admission control for trip-planning turns.
+    - At most max_concurrency turns run at once across all users.
+    - Turns of one user (one checkpoint thread) run strictly one after another, in arrival order.
+    - Users take free slots in the order their next turn became ready, so one user
+      with a backlog cannot starve the others.
+    - Waiting turns are told their queue position; new turns are rejected once the queues are full.
+    """
+    def __init__(self, max_concurrency: int = None, max_queue: int = None, max_queue_per_user: int = None):
+        self.max_concurrency = max_concurrency or settings.max_concurrent_plans
+        self.max_queue = max_queue or settings.max_queued_requests
+        self.max_queue_per_user = max_queue_per_user or settings.max_queued_per_user
+
+        self._user_queues = {}  # {user_id: deque[_Ticket]} (head = running or next to run)
+        self._ready = deque()   # head tickets waiting for a free slot, FIFO
+        self._running = 0
+
+    async def run(self, user_id: str, job, on_position=None):
+        """
+        Run job() (a coroutine function) once a slot is free and the user's earlier turns are done.
+        on_position(position) is called whenever the number of turns ahead changes.
+        """
+        ticket = self._admit(user_id, on_position)
+        try:
+            self._dispatch()
+            await ticket.started
+        except asyncio.CancelledError:
+            self._release(ticket, was_running=ticket.started.done() and not ticket.started.cancelled())
+            raise
+
+        try:
+            return await job()
+        finally:
+            self._release(ticket, was_running=True)
+
+    # --- QUEUEING ---
+    def _admit(self, user_id: str, on_position) -> _Ticket:
+        waiting = sum(len(queue) for queue in self._user_queues.values()) - self._running
+        user_queue = self._user_queues.setdefault(user_id, deque())
+        if waiting >= self.max_queue or len(user_queue) > self.max_queue_per_user:
+            if not user_queue:
+                del self._user_queues[user_id]
+            logger.warning(f"Rejected request from {user_id}: queue full ({waiting} waiting)")
+            raise SchedulerFullError("The planner is busy right now. Please try again in a moment.")
+
+        ticket = _Ticket(user_id, on_position)
+        user_queue.append(ticket)
+        if len(user_queue) == 1:
+            self._ready.append(ticket)
+        return ticket
+
+    def _dispatch(self):
+        while self._ready and self._running < self.max_concurrency:
+            ticket = self._ready.popleft()
+            self._running += 1
+            ticket.started.set_result(True)
+        self._notify_positions()
+
+    def _release(self, ticket: _Ticket, was_running: bool):
+        if was_running:
+            self._running -= 1
+        elif ticket in self._ready:
+            self._ready.remove(ticket)
+
+        user_queue = self._user_queues.get(ticket.user_id, deque())
+        was_head = bool(user_queue) and user_queue[0] is ticket
+        if ticket in user_queue:
+            user_queue.remove(ticket)
+        if not user_queue:
+            self._user_queues.pop(ticket.user_id, None)
+        elif was_head:
+            # The user's next turn may now compete for a slot
+            self._ready.append(user_queue[0])
+        self._dispatch()
+
+    # --- POSITIONS ---
+    def position(self, ticket: _Ticket) -> int:
+        """Number of turns that have to start before this one (0 = running)."""
+        if ticket.started.done():
+            return 0
+        if ticket in self._ready:
+            return self._ready.index(ticket) + 1
+        user_queue = self._user_queues.get(ticket.user_id, deque())
+        return len(self._ready) + list(user_queue).index(ticket)
+
+    def _notify_positions(self):
+        for user_queue in self._user_queues.values():
+            for ticket in user_queue:
+                position = self.position(ticket)
+                if position == ticket.last_position or not ticket.on_position or position == 0:
+                    continue
+                ticket.last_position = position
+                result = ticket.on_position(position)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+
+    def stats(self) -> dict:
+        queued = sum(len(queue) for queue in self._user_queues.values()) - self._running
+        return {
+            "running": self._running,
+            "queued": queued,
+            "users": len(self._user_queues),
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+# Shared instance used by the WebSocket handler
+request_scheduler = RequestScheduler()
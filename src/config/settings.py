@@ -19,17 +19,110 @@ class Settings(BaseSettings):
     request_timeout: int = 120
     max_retries: int = 5
     temperature: float = 0.0
+
+    # Model routing per node: "fast" (flash_model), "pro" (pro_model) or "auto"
+    gather_info_model_tier: str = "fast"
+    flights_model_tier: str = "fast"
+    destinations_model_tier: str = "fast"
+    itinerary_model_tier: str = "auto"
+    revision_model_tier: str = "fast"
+    # Parallel day planning calls; unset: same as itinerary_model_tier ("fast" trades quality for cost)
+    itinerary_header_model_tier: Optional[str] = None
+    itinerary_day_model_tier: Optional[str] = None
+    route_pro_min_score: int = 1
+    route_large_input_chars: int = 12000
+    
+    # Itinerary prompt packing. The budget is in estimated tokens (characters /
+    # context_chars_per_token), not the model's exact token count
+    context_packing_enabled: bool = True
+    itinerary_context_token_budget: int = 6000
+    context_chars_per_token: float = 4.0
+    context_max_line_chars: int = 240
+    
+    # Plan revisions (rewrite only the sections a concern touches)
+    diff_revision_enabled: bool = True
+    revision_max_sections: int = 3
+
+    # Parallel day planning (one model call per itinerary day, merged into one plan)
+    parallel_day_planning: bool = True
+    parallel_planning_min_days: int = 3
+    parallel_planning_max_days: int = 30
+    parallel_planning_concurrency: int = 4
+    
+    # Destination research
+    destination_batch_mode: bool = True
+    city_profile_concurrency: int = 6
+    summarize_destination_info: bool = False  # extra model call; the planner reads the structured places
+    
+    # Flight search
+    flight_route_concurrency: int = 4
+    flight_requests_per_second: float = 5.0
+    strict_airport_validation: bool = False
+    flight_direct_search: bool = True
+    summarize_flight_info: bool = False  # extra model call; the planner reads the structured flight options
+    flight_options_per_leg: int = 3
+    
+    # Speculative prefetch (flights / destination data while info gathering is in progress)
+    prefetch_enabled: bool = True
+    prefetch_max_workers: int = 4
+    prefetch_wait_seconds: float = 60.0
+    prefetch_ttl_seconds: float = 1800.0
+    prefetch_max_threads: int = 256
+    
+    # Request scheduling (WebSocket server)
+    max_concurrent_plans: int = 4
+    max_queued_requests: int = 100
+    max_queued_per_user: int = 3
     
     # Database
     database_url: str = "sqlite:///travel_planner.db"
+    checkpointer_backend: str = "sqlite"
+    checkpoint_batch_size: int = 20
+    checkpoint_flush_seconds: float = 2.0
+    checkpoint_compression_level: int = 6
+    checkpoint_idle_seconds: float = 900
+    checkpoint_max_resident_threads: int = 256
+    checkpoint_keep_versions: int = 5
+    
+    # Conversation history
+    history_compaction_enabled: bool = True
+    history_keep_messages: int = 12
+    history_compaction_mode: str = "summarize"  # "summarize" or "drop"
+    history_summary_max_chars: int = 2000
+    history_stats_max_threads: int = 1024
+    fast_path_enabled: bool = True  # rule-based gather_info extraction before the LLM
     
     # Cache
     cache_ttl_hours: int = 24
     enable_cache: bool = True
+    enable_request_coalescing: bool = True
+    cache_path: str = "travel_planner_cache.db"
+    cache_max_memory_entries: int = 512
+    distance_cache_ttl_hours: int = 168
+    geocode_cache_ttl_hours: int = 720
+    geocode_memory_entries: int = 2048
+    web_search_general_ttl_hours: int = 72
+    web_search_news_ttl_hours: int = 1
+    web_search_escalation_threshold: float = 0.6
+    web_search_min_content_chars: int = 300
+    distance_fallback_enabled: bool = True
     
     # Logging
     log_level: str = "INFO"
     log_file: str = "src/logging/logs/travel_planner.log"
+    tracing_enabled: bool = True
+    trace_file: str = "src/logging/logs/traces.jsonl"
+    trace_history: int = 50
+    trace_file_max_bytes: int = 10485760
+    trace_file_backups: int = 5
+    
+    # HTTP transport (shared by every external API client)
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 20
+    # Unset: request_timeout (which also bounds the LLM calls)
+    http_connect_timeout: Optional[float] = None
+    http_read_timeout: Optional[float] = None
+    http_max_retries: int = 2
     
     # Proxy (Optional)
     http_proxy: Optional[str] = None
@@ -38,6 +131,7 @@ class Settings(BaseSettings):
     # Application
     debug: bool = False
     environment: str = "production"
+    lazy_startup: bool = True  # build graphs, models and agents on first use
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,423 @@
+import asyncio
+import atexit
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_checkpoint_id TEXT,
+        type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))""",
+    """CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+        thread_id TEXT, checkpoint_ns TEXT, channel TEXT, version TEXT, type TEXT, blob BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version))""",
+    """CREATE TABLE IF NOT EXISTS checkpoint_writes (
+        thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,
+        channel TEXT, type TEXT, value BLOB, task_path TEXT,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))""",
+]
+
+
+def sqlite_path_from_url(database_url: str) -> str:
+    """'sqlite:///travel_planner.db' -> 'travel_planner.db'"""
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError(f"Only sqlite:/// database urls are supported by the checkpointer: {database_url}")
+    return database_url[len("sqlite:///"):]
+
+
+class CompactSqliteSaver(BaseCheckpointSaver):
+    """
+    Durable LangGraph checkpointer backed by SQLite.
+
+    - Channel values are stored once per version (unchanged channels are not rewritten)
+      and every payload is zlib-compressed.
+    - Writes are buffered and committed in batches (by count or age), and always
+      flushed before a read so callers never observe stale state.
+    - Only a bounded set of recently used threads keeps its latest checkpoint in RAM;
+      idle threads are evicted and reloaded from disk on their next turn.
+    """
+    def __init__(
+        self,
+        path: str = None,
+        batch_size: int = None,
+        flush_seconds: float = None,
+        compression_level: int = None,
+        idle_seconds: float = None,
+        max_resident_threads: int = None,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path or sqlite_path_from_url(settings.database_url)
+        self.batch_size = batch_size or settings.checkpoint_batch_size
+        self.flush_seconds = flush_seconds if flush_seconds is not None else settings.checkpoint_flush_seconds
+        self.compression_level = compression_level if compression_level is not None else settings.checkpoint_compression_level
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.checkpoint_idle_seconds
+        self.max_resident_threads = max_resident_threads or settings.checkpoint_max_resident_threads
+
+        self._lock = threading.RLock()
+        self._pending = []            # [(sql, params)] waiting for the next commit
+        self._last_flush = time.monotonic()
+        self._resident = OrderedDict()  # {(thread_id, checkpoint_ns): (last_access, CheckpointTuple)}
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+        atexit.register(self.close)
+
+    # --- SERIALIZATION ---
+    def _dump(self, value):
+        type_, data = self.serde.dumps_typed(value)
+        return type_, zlib.compress(data, self.compression_level)
+
+    def _load(self, type_: str, data: bytes):
+        return self.serde.loads_typed((type_, zlib.decompress(data)))
+
+    # --- WRITE BATCHING ---
+    def _queue(self, sql: str, params: tuple):
+        if not self._pending:
+            # Make sure a quiet thread's last writes still reach disk
+            timer = threading.Timer(self.flush_seconds, self.flush)
+            timer.daemon = True
+            timer.start()
+        self._pending.append((sql, params))
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Commit every buffered write in one transaction, then evict idle threads."""
+        with self._lock:
+            if self._pending:
+                with self._connection:
+                    for sql, params in self._pending:
+                        self._connection.execute(sql, params)
+                self._pending.clear()
+            self._last_flush = time.monotonic()
+            self._evict_idle()
+
+    def close(self):
+        with self._lock:
+            try:
+                self.flush()
+            except sqlite3.ProgrammingError:
+                pass  # already closed
+
+    # --- RESIDENT CACHE ---
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key in [k for k, (last_access, _) in self._resident.items() if now - last_access > self.idle_seconds]:
+            del self._resident[key]
+        while len(self._resident) > self.max_resident_threads:
+            self._resident.popitem(last=False)
+
+    def _invalidate(self, thread_id: str, checkpoint_ns: str):
+        self._resident.pop((thread_id, checkpoint_ns), None)
+
+    def resident_threads(self) -> int:
+        return len(self._resident)
+
+    # --- READS ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self._lock:
+            key = (thread_id, checkpoint_ns)
+            if not checkpoint_id and key in self._resident:
+                _, cached = self._resident.pop(key)
+                self._resident[key] = (time.monotonic(), cached)
+                return cached._replace(checkpoint=copy_checkpoint(cached.checkpoint))
+
+            self.flush()
+            if checkpoint_id:
+                row = self._connection.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._connection.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+
+            checkpoint_tuple = self._build_tuple(thread_id, checkpoint_ns, row)
+            if not checkpoint_id:
+                self._resident[key] = (time.monotonic(), checkpoint_tuple)
+                self._evict_idle()
+                return checkpoint_tuple._replace(checkpoint=copy_checkpoint(checkpoint_tuple.checkpoint))
+            return checkpoint_tuple
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints")
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                checkpoint_tuple = self._build_tuple(row[0], row[1], row[2:])
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(checkpoint_tuple)
+        yield from results
+
+    def _build_tuple(self, thread_id: str, checkpoint_ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint = self._load(type_, checkpoint_blob)
+        checkpoint["channel_values"] = self._load_channel_values(thread_id, checkpoint_ns, checkpoint["channel_versions"])
+
+        writes = self._connection.execute(
+            "SELECT task_id, channel, type, value FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=self._load(metadata_type, metadata_blob),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            pending_writes=[(task_id, channel, self._load(t, value)) for task_id, channel, t, value in writes],
+        )
+
+    def _load_channel_values(self, thread_id: str, checkpoint_ns: str, versions: dict):
+        values = {}
+        for channel, version in versions.items():
+            row = self._connection.execute(
+                "SELECT type, blob FROM checkpoint_blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row and row[0] != "empty":
+                values[channel] = self._load(row[0], row[1])
+        return values
+
+    # --- WRITES ---
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+
+        with self._lock:
+            self._invalidate(thread_id, checkpoint_ns)
+            # Only channels that changed in this step get a new blob
+            for channel, version in new_versions.items():
+                type_, blob = self._dump(values[channel]) if channel in values else ("empty", b"")
+                self._queue(
+                    "INSERT OR REPLACE INTO checkpoint_blobs VALUES (?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, channel, str(version), type_, blob),
+                )
+            type_, checkpoint_blob = self._dump(stored)
+            metadata_type, metadata_blob = self._dump(get_checkpoint_metadata(config, metadata))
+            self._queue(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, checkpoint_blob, metadata_type, metadata_blob),
+            )
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        with self._lock:
+            self._invalidate(thread_id, checkpoint_ns)
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                # Regular writes are first-write-wins; special writes (errors, interrupts) replace
+                verb = "INSERT OR IGNORE" if write_idx >= 0 else "INSERT OR REPLACE"
+                type_, blob = self._dump(value)
+                self._queue(
+                    f"{verb} INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, type_, blob, task_path),
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.flush()
+            with self._connection:
+                for table in ["checkpoints", "checkpoint_blobs", "checkpoint_writes"]:
+                    self._connection.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            for key in [k for k in self._resident if k[0] == thread_id]:
+                del self._resident[key]
+
+    def prune_thread(self, thread_id: str, keep_last: int = 1) -> int:
+        """
+        Keep only the newest `keep_last` checkpoints of a thread (per namespace).
+        Older checkpoints, their pending writes and channel blobs no kept checkpoint
+        references are deleted. Returns the number of stored bytes freed.
+        """
+        keep_last = max(1, keep_last)
+        freed = 0
+        with self._lock:
+            self.flush()
+            namespaces = [row[0] for row in self._connection.execute(
+                "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )]
+            with self._connection:
+                for checkpoint_ns in namespaces:
+                    freed += self._prune_namespace(thread_id, checkpoint_ns, keep_last)
+        if freed:
+            logger.info(f"Pruned checkpoints of thread {thread_id}: {freed} bytes freed")
+        return freed
+
+    def _prune_namespace(self, thread_id: str, checkpoint_ns: str, keep_last: int) -> int:
+        rows = self._connection.execute(
+            "SELECT checkpoint_id, type, checkpoint, LENGTH(checkpoint) + LENGTH(metadata) FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+            (thread_id, checkpoint_ns),
+        ).fetchall()
+        kept, dropped = rows[:keep_last], rows[keep_last:]
+        if not dropped:
+            return 0
+
+        freed = sum(row[3] for row in dropped)
+        oldest_kept = kept[-1][0]
+        freed += self._connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        ).fetchone()[0]
+        self._connection.execute(
+            "DELETE FROM checkpoint_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+        self._connection.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+
+        # Blobs are shared between checkpoints, so only drop versions nothing kept points at
+        referenced = set()
+        for _, type_, checkpoint_blob, _ in kept:
+            versions = self._load(type_, checkpoint_blob)["channel_versions"]
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+        blobs = self._connection.execute(
+            "SELECT channel, version, LENGTH(blob) FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns),
+        ).fetchall()
+        for channel, version, size in blobs:
+            if (channel, version) not in referenced:
+                freed += size or 0
+                self._connection.execute(
+                    "DELETE FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, checkpoint_ns, channel, version),
+                )
+        return freed
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+            else:
+                self.prune_thread(thread_id, keep_last=1)
+
+    # --- ASYNC ---
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ):
+        results = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in results:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        # Only buffers unless a batch is due, so it is cheap enough for the event loop
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def build_checkpointer():
+    """Create the checkpointer selected by settings.checkpointer_backend ("sqlite" or "memory")."""
+    if settings.checkpointer_backend == "memory":
+        return InMemorySaver()
+    return CompactSqliteSaver()
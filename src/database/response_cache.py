@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+from src.logging.tracing import tracer
+
+logger = setup_logger(__file__)
+
+
+class ResponseCache:
+    """
+    Disk-backed response cache for external API lookups.
+    Entries live in a local SQLite file (so they survive restarts) and the most
+    recently used ones are kept in an in-memory LRU for fast repeated hits.
+    """
+    def __init__(self, path: str = None, ttl_hours: float = None, max_memory_entries: int = None, enabled: bool = None):
+        self.path = path or settings.cache_path
+        self.ttl_seconds = (ttl_hours if ttl_hours is not None else settings.cache_ttl_hours) * 3600
+        self.max_memory_entries = max_memory_entries or settings.cache_max_memory_entries
+        self.enabled = settings.enable_cache if enabled is None else enabled
+
+        self._memory = OrderedDict()  # {key: (created_at, value)}
+        self._lock = threading.Lock()
+        self._counters = {}  # {namespace: {"hits": int, "misses": int}}
+        self._connection = None
+
+    # --- KEYS ---
+    @staticmethod
+    def make_key(namespace: str, *parts) -> str:
+        """Build a stable key: the namespace plus whitespace/case-normalized parts."""
+        normalized = [" ".join(str(part).lower().split()) for part in parts]
+        return "|".join([namespace, *normalized])
+
+    # --- STORAGE ---
+    def _db(self):
+        if self._connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, namespace TEXT, created_at REAL, value TEXT)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _count(self, namespace: str, outcome: str):
+        counter = self._counters.setdefault(namespace, {"hits": 0, "misses": 0})
+        counter[outcome] += 1
+
+    def _remember(self, key: str, created_at: float, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # --- PUBLIC API ---
+    def get(self, namespace: str, key: str, ttl_hours: float = None):
+        """Return the cached value, or None when missing, expired or caching is disabled."""
+        if not self.enabled:
+            return None
+        ttl_seconds = ttl_hours * 3600 if ttl_hours is not None else self.ttl_seconds
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                try:
+                    row = self._db().execute(
+                        "SELECT created_at, value FROM response_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Response cache read failed: {e}")
+                    row = None
+                if row:
+                    entry = (row[0], json.loads(row[1]))
+                    self._remember(key, *entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if entry is None or now - entry[0] > ttl_seconds:
+                self._count(namespace, "misses")
+                return None
+
+            self._count(namespace, "hits")
+            return entry[1]
+
+    def set(self, namespace: str, key: str, value):
+        if not self.enabled:
+            return
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, value)
+            try:
+                self._db().execute(
+                    "INSERT OR REPLACE INTO response_cache (key, namespace, created_at, value) VALUES (?, ?, ?, ?)",
+                    (key, namespace, created_at, json.dumps(value)),
+                )
+                self._db().commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning(f"Response cache write failed: {e}")
+
+    def get_or_fetch(self, namespace: str, key: str, fetch, ttl_hours: float = None, should_cache=None):
+        """
+        Return the cached value for key, otherwise call fetch() and store its result.
+        should_cache(value) can veto storing (e.g. API error payloads).
+        """
+        with tracer.span(f"fetch:{namespace}", kind="fetch") as span:
+            cached = self.get(namespace, key, ttl_hours=ttl_hours)
+            if span is not None:
+                span["attrs"]["cache"] = "hit" if cached is not None else "miss"
+            if cached is not None:
+                return cached
+            value = fetch()
+            if should_cache is None or should_cache(value):
+                self.set(namespace, key, value)
+            return value
+
+    def purge_expired(self):
+        """Delete expired rows from disk and memory."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for key in [k for k, (created_at, _) in self._memory.items() if created_at < cutoff]:
+                del self._memory[key]
+            self._db().execute("DELETE FROM response_cache WHERE created_at < ?", (cutoff,))
+            self._db().commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = {}
+            for namespace, counter in self._counters.items():
+                total = counter["hits"] + counter["misses"]
+                namespaces[namespace] = {
+                    **counter,
+                    "hit_rate": round(counter["hits"] / total, 3) if total else 0.0,
+                }
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "hits": sum(c["hits"] for c in self._counters.values()),
+                "misses": sum(c["misses"] for c in self._counters.values()),
+                "namespaces": namespaces,
+            }
+
+
+# Shared instance used by every tool
+response_cache = ResponseCache()
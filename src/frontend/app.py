@@ -59,6 +59,8 @@ async def chat_logic(user_prompt):
                     
                     # C. START PLANNING PHASE
                     with st.status("🗺️ Planning your trip...", expanded=True) as status:
+                        itinerary_placeholder = None
+                        streamed_text = ""
                         
                         # Inner Loop: We stay here until the final itinerary arrives
                         while True:
@@ -76,13 +78,26 @@ async def chat_logic(user_prompt):
                                 if "All_Details_Fetched" not in new_content:
                                     st.write(f"⚙️ {new_content}")
                             
-                            # 2. Show Final Result
+                            # 2. Render the itinerary progressively as tokens arrive
+                            elif new_type == "CHUNK":
+                                if itinerary_placeholder is None:
+                                    status.update(label="✍️ Writing your itinerary...", expanded=False)
+                                    st.markdown("---")
+                                    st.markdown("### 🎉 Your Trip Itinerary")
+                                    itinerary_placeholder = st.empty()
+                                streamed_text += new_content
+                                itinerary_placeholder.markdown(streamed_text + "▌")
+                            
+                            # 3. Show Final Result
                             elif new_type == "RESPONSE":
                                 status.update(label="✅ Trip Planned!", state="complete", expanded=False)
                                 
-                                st.markdown("---")
-                                st.markdown("### 🎉 Your Trip Itinerary")
-                                st.markdown(new_content)
+                                if itinerary_placeholder is None:
+                                    st.markdown("---")
+                                    st.markdown("### 🎉 Your Trip Itinerary")
+                                    itinerary_placeholder = st.empty()
+                                # The final text replaces the streamed draft
+                                itinerary_placeholder.markdown(new_content)
                                 
                                 # Save result to history
                                 st.session_state.messages.append({"role": "assistant", "content": new_content})
@@ -0,0 +1,272 @@
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+# Trace (one planner request) and innermost open span of the running code path
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+
+class Tracer:
+    """
+    Per-request latency tracing.
+    A trace is one run_trip_planner call (correlated by thread_id); spans are opened for
+    graph nodes, agent invocations, LLM calls (with token counts), LangChain tool calls and
+    upstream fetches (with cache hit/miss). Finished traces are appended to
+    settings.trace_file as JSON lines (one span per line, rotated at trace_file_max_bytes)
+    and kept in memory for waterfall().
+    """
+    def __init__(self, trace_file: str = None, history: int = None):
+        self.enabled = settings.tracing_enabled
+        self.trace_file = Path(trace_file or settings.trace_file)
+        self.history = history or settings.trace_history
+        self._lock = threading.Lock()
+        self._traces = OrderedDict()  # {trace_id: trace}
+        self._exporter = None
+        self.callback = TraceCallbackHandler(self)
+
+    # --- TRACES ---
+    @contextmanager
+    def trace(self, thread_id: str, name: str = "request"):
+        if not self.enabled:
+            yield None
+            return
+        trace = {"trace_id": uuid.uuid4().hex, "thread_id": thread_id, "start": time.perf_counter(),
+                 "started_at": time.time(), "spans": []}
+        trace_token = _current_trace.set(trace)
+        try:
+            with self.span(name, kind="request", thread_id=thread_id):
+                yield trace
+        finally:
+            _current_trace.reset(trace_token)
+            self._finish(trace)
+
+    def _finish(self, trace):
+        with self._lock:
+            self._traces[trace["trace_id"]] = trace
+            while len(self._traces) > self.history:
+                self._traces.popitem(last=False)
+        try:
+            # One record per trace, so rotation never splits a trace across files
+            lines = [json.dumps(self._export(trace, span), default=str) for span in trace["spans"]]
+            if lines:
+                self._trace_exporter().info("\n".join(lines))
+        except OSError as e:
+            logger.warning(f"Could not write trace {trace['trace_id']}: {e}")
+
+    def _trace_exporter(self) -> logging.Logger:
+        """JSON lines writer for settings.trace_file, rotated like the application log."""
+        with self._lock:
+            if self._exporter is None:
+                self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+                exporter = logging.getLogger(f"trace_export:{self.trace_file}")
+                exporter.setLevel(logging.INFO)
+                exporter.propagate = False
+                if not exporter.handlers:
+                    handler = RotatingFileHandler(self.trace_file, maxBytes=settings.trace_file_max_bytes,
+                                                  backupCount=settings.trace_file_backups, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    exporter.addHandler(handler)
+                self._exporter = exporter
+            return self._exporter
+
+    def _export(self, trace, span) -> dict:
+        return {"trace_id": trace["trace_id"], "thread_id": trace["thread_id"],
+                "started_at": trace["started_at"], **span}
+
+    # --- SPANS ---
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attrs):
+        """Time the enclosed block as a child of the current span. Yields the span dict (or None)."""
+        span = self.start_span(name, kind, **attrs)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span["status"] = "error"
+            span["attrs"]["error"] = str(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def start_span(self, name: str, kind: str, parent: dict = None, **attrs):
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = parent or _current_span.get()
+        span = {
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": parent["span_id"] if parent else None,
+            "name": name,
+            "kind": kind,
+            "start_ms": round((time.perf_counter() - trace["start"]) * 1000, 2),
+            "duration_ms": None,
+            "status": "ok",
+            "attrs": dict(attrs),
+            "_trace": trace,
+        }
+        return span
+
+    def end_span(self, span: dict, status: str = None):
+        trace = span.pop("_trace")
+        span["duration_ms"] = round((time.perf_counter() - trace["start"]) * 1000 - span["start_ms"], 2)
+        if status:
+            span["status"] = status
+        with self._lock:
+            trace["spans"].append(span)
+
+    def annotate(self, **attrs):
+        """Add attributes to the innermost open span."""
+        span = _current_span.get()
+        if span is not None:
+            span["attrs"].update(attrs)
+
+    def current_span(self):
+        return _current_span.get()
+
+    # --- VIEWING ---
+    def traces(self, thread_id: str = None) -> list:
+        with self._lock:
+            return [trace for trace in self._traces.values() if thread_id is None or trace["thread_id"] == thread_id]
+
+    def waterfall(self, trace_id: str = None, width: int = 50) -> str:
+        """Text waterfall of a trace (default: the latest one)."""
+        with self._lock:
+            if not self._traces:
+                return "No traces recorded."
+            trace = self._traces[trace_id] if trace_id else next(reversed(self._traces.values()))
+        return render_waterfall(trace["trace_id"], trace["thread_id"], trace["spans"], width)
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """LLM and tool spans from LangChain callbacks, keyed by run_id."""
+    run_inline = True
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._runs = {}
+
+    def _start(self, run_id, parent_run_id, name, kind, **attrs):
+        parent = self._runs.get(parent_run_id)
+        span = self.tracer.start_span(name, kind, parent=parent, **attrs)
+        if span is not None:
+            self._runs[run_id] = span
+
+    def _end(self, run_id, status=None, **attrs):
+        span = self._runs.pop(run_id, None)
+        if span is not None:
+            span["attrs"].update(attrs)
+            self.tracer.end_span(span, status)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        model = (kwargs.get("metadata") or {}).get("ls_model_name") or (serialized or {}).get("name", "chat_model")
+        self._start(run_id, parent_run_id, f"llm:{model}", "llm")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, f"llm:{(serialized or {}).get('name', 'llm')}", "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0) or 0
+                output_tokens += usage.get("output_tokens", 0) or 0
+        self._end(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error", error=str(error))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, f"tool:{(serialized or {}).get('name', 'tool')}", "tool")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error", error=str(error))
+
+
+def render_waterfall(trace_id: str, thread_id: str, spans: list, width: int = 50) -> str:
+    """Indented span tree with a bar per span, scaled to the trace's total duration."""
+    if not spans:
+        return f"Trace {trace_id} ({thread_id}): no spans"
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+    span_ids = {span["span_id"] for span in spans}
+    roots = [span for span in spans if span["parent_id"] not in span_ids]
+    total = max(span["start_ms"] + (span["duration_ms"] or 0) for span in spans) or 1.0
+
+    lines = [f"Trace {trace_id} ({thread_id}) {total:.0f} ms"]
+
+    def walk(span, depth):
+        start = int(span["start_ms"] / total * width)
+        length = max(1, int((span["duration_ms"] or 0) / total * width))
+        bar = " " * start + "█" * min(length, width - start)
+        extra = {k: v for k, v in span["attrs"].items() if k in ["tier", "cache", "input_tokens", "output_tokens", "error"]}
+        label = ("  " * depth + span["name"])[:40]
+        details = " ".join(f"{k}={v}" for k, v in extra.items())
+        flag = " !" if span["status"] == "error" else ""
+        lines.append(f"{label:<40} |{bar:<{width}}| {span['duration_ms']:>9.1f} ms {details}{flag}")
+        for child in sorted(children.get(span["span_id"], []), key=lambda s: s["start_ms"]):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start_ms"]):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def load_traces(path: str) -> dict:
+    """{trace_id: {"thread_id", "spans"}} from an exported JSON lines file."""
+    traces = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                trace = traces.setdefault(span["trace_id"], {"thread_id": span["thread_id"], "spans": []})
+                trace["spans"].append(span)
+    return traces
+
+
+def submit_in_context(pool, fn, *args):
+    """
+    pool.submit() that runs fn in a copy of the caller's context, so spans opened by the
+    worker thread nest under the current trace/span instead of being lost.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+# Shared instance
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    # python -m src.logging.tracing [trace_file] [trace_id|thread_id]
+    path = sys.argv[1] if len(sys.argv) > 1 else settings.trace_file
+    wanted = sys.argv[2] if len(sys.argv) > 2 else None
+    exported = load_traces(path)
+    selected = [(trace_id, trace) for trace_id, trace in exported.items()
+                if wanted in [None, trace_id, trace["thread_id"]]]
+    for trace_id, trace in (selected if wanted else selected[-1:]):
+        print(render_waterfall(trace_id, trace["thread_id"], trace["spans"]))
+        print()
@@ -0,0 +1,182 @@
+import math
+import re
+import threading
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+# Conversational filler the upstream agents wrap around their answers
+FILLER_PATTERN = re.compile(
+    r"^(sure|certainly|of course|here is|here are|here's|i hope|hope this|let me know|feel free|"
+    r"happy travels|enjoy your trip|please note that i|as requested)\b", re.IGNORECASE
+)
+MARKDOWN_PATTERN = re.compile(r"(\*\*|__|`)")
+RULE_PATTERN = re.compile(r"^[-=*_]{3,}$")
+HEADING_PATTERN = re.compile(r"^#{1,6}\s*")
+
+
+class ContextPacker:
+    """
+    Builds the itinerary compiler prompt within a token budget.
+    Every input becomes a named section with a priority (0 = always kept in full).
+    Sections are compacted first (markdown, filler and duplicate lines removed, lists of
+    records rendered as tables), then lower-priority sections are shortened or dropped
+    until the estimated token count fits settings.itinerary_context_token_budget.
+    Verbatim sections (a plan to revise) are never shortened: only the others shrink.
+    """
+    def __init__(self, token_budget: int = None, chars_per_token: float = None, max_line_chars: int = None):
+        self.token_budget = token_budget or settings.itinerary_context_token_budget
+        self.chars_per_token = chars_per_token or settings.context_chars_per_token
+        self.max_line_chars = max_line_chars or settings.context_max_line_chars
+        self._lock = threading.Lock()
+        self._stats = {"packs": 0, "tokens_before": 0, "tokens_after": 0, "sections_trimmed": 0, "sections_dropped": 0}
+
+    # --- TOKENS ---
+    def count_tokens(self, text: str) -> int:
+        """
+        Local estimate (no API round trip); Gemini averages ~4 characters per token, so the
+        budget is approximate, not an exact model token count.
+        """
+        return math.ceil(len(text or "") / self.chars_per_token)
+
+    # --- PACKING ---
+    def pack(self, sections: list, footer: str = "") -> dict:
+        """
+        sections: [{"name", "title", "content", "priority", "verbatim"}], content is text, a dict
+        of fields or a list of record dicts; verbatim sections (e.g. a plan to revise) keep their
+        formatting and repeated lines. Returns {"prompt", "tokens", "tokens_before", "sections"}.
+        """
+        rendered = []
+        tokens_before = 0
+        for section in sections:
+            raw = self._render(section["content"])
+            tokens_before += self.count_tokens(raw)
+            lines = self._verbatim(raw) if section.get("verbatim") else self._compact(raw)
+            if lines:
+                rendered.append({**section, "lines": lines})
+
+        # Sections that are never trimmed are paid for first, whatever their priority
+        fixed = [section for section in rendered if section["priority"] == 0 or section.get("verbatim")]
+        remaining = self.token_budget - self.count_tokens(footer) - sum(self._section_tokens(section) for section in fixed)
+        if remaining < 0:
+            logger.warning(f"Untrimmable context ({[section['name'] for section in fixed]}) alone exceeds the token budget "
+                           f"({self.token_budget - remaining} > {self.token_budget}); sending it over budget")
+        for priority in sorted({section["priority"] for section in rendered}):
+            group = [section for section in rendered if section["priority"] == priority and section not in fixed]
+            sizes = {section["name"]: self._section_tokens(section) for section in group}
+            total = sum(sizes.values())
+            if total <= remaining:
+                remaining -= total
+                continue
+            # Over budget: fair share of what is left, so small sections stay whole
+            # and the large ones are trimmed (smallest first, leftovers passed on)
+            group.sort(key=lambda section: sizes[section["name"]])
+            for index, section in enumerate(group):
+                share = max(remaining, 0) // (len(group) - index)
+                self._fit(section, share)
+                remaining -= self._section_tokens(section) if section["lines"] else 0
+
+        kept = [section for section in rendered if section["lines"]]
+        blocks = [f"{section['title']}:\n" + "\n".join(section["lines"]) for section in kept]
+        prompt = "\n\n".join(blocks + ([footer] if footer else []))
+        tokens = self.count_tokens(prompt)
+
+        trimmed = sum(1 for section in kept if section.get("trimmed"))
+        dropped = len(rendered) - len(kept)
+        with self._lock:
+            self._stats["packs"] += 1
+            self._stats["tokens_before"] += tokens_before
+            self._stats["tokens_after"] += tokens
+            self._stats["sections_trimmed"] += trimmed
+            self._stats["sections_dropped"] += dropped
+        logger.info(f"Packed itinerary context: ~{tokens_before} -> ~{tokens} tokens (budget {self.token_budget}, {trimmed} trimmed, {dropped} dropped)")
+        return {
+            "prompt": prompt,
+            "tokens": tokens,
+            "tokens_before": tokens_before,
+            "sections": {section["name"]: self._section_tokens(section) for section in kept},
+        }
+
+    def _section_tokens(self, section) -> int:
+        return self.count_tokens(section["title"] + "\n" + "\n".join(section["lines"]))
+
+    def _fit(self, section, allowance: int):
+        """Shorten long lines first, then drop lines from the end, until the section fits."""
+        if self._section_tokens(section) <= allowance:
+            return
+        section["trimmed"] = True
+        lines = [line if len(line) <= self.max_line_chars else line[:self.max_line_chars - 1] + "…" for line in section["lines"]]
+        section["lines"] = lines
+        if self._section_tokens(section) <= allowance:
+            return
+        kept = list(lines)
+        while kept:
+            kept.pop()
+            section["lines"] = kept + [f"(… {len(lines) - len(kept)} more lines omitted)"]
+            if self._section_tokens(section) <= allowance:
+                return
+        # Nothing useful fits: drop the section entirely
+        section["lines"] = []
+
+    # --- RENDERING ---
+    def _render(self, content) -> str:
+        if content is None:
+            return ""
+        if isinstance(content, dict):
+            return "\n".join(f"- {key}: {self._value(value)}" for key, value in content.items() if not self._is_empty(value))
+        if isinstance(content, list) and content and all(isinstance(row, dict) for row in content):
+            return self.table(content)
+        return str(content)
+
+    def table(self, rows: list, columns: list = None) -> str:
+        """Records as a pipe table (one header, one line per record)."""
+        columns = columns or list(dict.fromkeys(key for row in rows for key in row))
+        lines = [" | ".join(columns)]
+        for row in rows:
+            lines.append(" | ".join(self._value(row.get(column)) for column in columns))
+        return "\n".join(lines)
+
+    def _value(self, value) -> str:
+        if isinstance(value, (list, tuple)):
+            return ", ".join(str(item) for item in value if not self._is_empty(item))
+        return "" if value is None else " ".join(str(value).split())
+
+    def _is_empty(self, value) -> bool:
+        if value is None:
+            return True
+        if isinstance(value, (list, tuple)):
+            return all(self._is_empty(item) for item in value)
+        return str(value).strip().lower() in ["", "none", "null"]
+
+    def _compact(self, text: str) -> list:
+        lines, seen = [], set()
+        for line in (text or "").splitlines():
+            line = HEADING_PATTERN.sub("", MARKDOWN_PATTERN.sub("", line)).strip()
+            line = " ".join(line.split())
+            if not line or RULE_PATTERN.match(line) or FILLER_PATTERN.match(line):
+                continue
+            key = line.lower().strip(" .:-*")
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+        return lines
+
+    def _verbatim(self, text: str) -> list:
+        """Only trailing whitespace and repeated blank lines are removed."""
+        lines = []
+        for line in (text or "").splitlines():
+            line = line.rstrip()
+            if line or (lines and lines[-1]):
+                lines.append(line)
+        while lines and not lines[-1]:
+            lines.pop()
+        return lines
+
+    def stats(self) -> dict:
+        with self._lock:
+            packs = self._stats["packs"]
+            saved = self._stats["tokens_before"] - self._stats["tokens_after"]
+            return {**self._stats, "avg_tokens_saved": round(saved / packs, 1) if packs else 0.0}
@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.config.settings import settings
+from src.model_service.revision_engine import DAY_PATTERN, HEADING_PATTERN
+from src.logging.logging import setup_logger
+from src.logging.tracing import submit_in_context
+
+logger = setup_logger(__file__)
+
+ATTRACTIONS_PER_DAY = 2
+RESTAURANTS_PER_DAY = 2  # lunch and dinner
+
+
+class ParallelDayPlanner:
+    """
+    Multi-day itinerary generation whose latency does not grow with Duration.
+    1. skeleton(): deterministic day-by-day assignment of the structured places
+       (city, hotel, attractions, restaurants; nothing is used twice).
+    2. The header (title, logistics, risks) and every day are generated concurrently,
+       bounded by settings.parallel_planning_concurrency (tiers: itinerary_header_model_tier,
+       itinerary_day_model_tier).
+    3. merge(): one report in the main planner's Markdown layout, streamable in day order.
+    The model calls are injected (generate(kind, prompt) -> text) so routing and
+    tracing stay in TravelAutomationSystem.
+    """
+    def __init__(self, context_packer, max_concurrency: int = None, min_days: int = None):
+        self.context_packer = context_packer
+        self.max_concurrency = max_concurrency or settings.parallel_planning_concurrency
+        self.min_days = min_days or settings.parallel_planning_min_days
+
+    # --- ELIGIBILITY ---
+    def days(self, state) -> int:
+        match = re.search(r"\d+", str(state.get("Duration") or ""))
+        return int(match.group()) if match else 0
+
+    def applies(self, state) -> bool:
+        """
+        Fresh plans of min_days..parallel_planning_max_days days with structured places to
+        assign and at least one day per city; anything else keeps the single-call planner
+        (the skeleton would otherwise drop days or cities).
+        """
+        days = self.days(state)
+        return (
+            settings.parallel_day_planning
+            and state.get("TravelMode", "Travel_Plan") == "Travel_Plan"
+            and self.min_days <= days <= settings.parallel_planning_max_days
+            and bool(state.get("places"))
+            and len(self._cities(state)) <= days
+        )
+
+    def _cities(self, state) -> list:
+        destinations = state.get("Destination") or []
+        destinations = destinations if isinstance(destinations, list) else [destinations]
+        return destinations or list(dict.fromkeys(place["city"] for place in state.get("places") or []))
+
+    # --- SKELETON ---
+    def skeleton(self, state) -> list:
+        total_days = self.days(state)
+        places = state.get("places") or []
+        cities = self._cities(state)
+
+        # Consecutive days per city, split as evenly as possible in travel order
+        per_city = [total_days // len(cities) + (1 if index < total_days % len(cities) else 0) for index in range(len(cities))]
+        pools = {
+            (city, category): [place for place in places if place.get("city") == city and place.get("category") == category]
+            for city in cities for category in ["attractions", "restaurants", "hotels"]
+        }
+
+        skeleton, number = [], 1
+        for city, day_count in zip(cities, per_city):
+            hotels = pools[(city, "hotels")]
+            for _ in range(day_count):
+                skeleton.append({
+                    "day": number,
+                    "date": self._date(state.get("StartDate"), number - 1),
+                    "city": city,
+                    "hotel": hotels[0]["title"] if hotels else None,
+                    "attractions": self._take(pools[(city, "attractions")], ATTRACTIONS_PER_DAY),
+                    "restaurants": self._take(pools[(city, "restaurants")], RESTAURANTS_PER_DAY),
+                })
+                number += 1
+        return skeleton
+
+    def _take(self, pool: list, count: int) -> list:
+        taken = pool[:count]
+        del pool[:count]
+        return [{"title": place.get("title"), "rating": place.get("rating"), "description": place.get("description")} for place in taken]
+
+    def _date(self, start_date, offset: int):
+        try:
+            return (datetime.strptime(str(start_date), "%Y-%m-%d") + timedelta(days=offset)).strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+
+    # --- PROMPTS ---
+    def trip_request(self, state) -> dict:
+        return {
+            "From": state.get('Departure'),
+            "To": state.get('Destination'),
+            "Start date": state.get('StartDate'),
+            "Duration (days)": state.get('Duration'),
+            "Budget": state.get('Budget'),
+            "Interests": state.get('Interest'),
+            "Extra": state.get('ExtraDetail'),
+        }
+
+    def header_prompt(self, state) -> str:
+        hotels = [place for place in state.get("places") or [] if place.get("category") == "hotels"]
+        return self.context_packer.pack([
+            {"name": "trip", "title": "TRIP REQUEST", "priority": 0, "content": self.trip_request(state)},
+            {"name": "flights", "title": "DATA SOURCE 1 (Flights)", "priority": 1, "content": state.get('flight_options') or state.get('flight_info')},
+            {"name": "hotels", "title": "DATA SOURCE 2 (Hotels)", "priority": 1, "content": hotels},
+        ], footer="Task: Write the title, Logistics Snapshot and Risk & Requirements sections only.")["prompt"]
+
+    def day_prompt(self, state, day: dict, skeleton: list) -> str:
+        others = [
+            place["title"] for other in skeleton if other["day"] != day["day"]
+            for place in other["attractions"] + other["restaurants"]
+        ]
+        assignment = {
+            "Day": day["day"], "Date": day["date"], "City": day["city"], "Hotel": day["hotel"],
+            "Interests": state.get('Interest'), "Extra": state.get('ExtraDetail'),
+        }
+        return self.context_packer.pack([
+            {"name": "assignment", "title": "DAY ASSIGNMENT", "priority": 0, "content": assignment},
+            {"name": "attractions", "title": "ATTRACTIONS", "priority": 0, "content": day["attractions"]},
+            {"name": "restaurants", "title": "RESTAURANTS", "priority": 0, "content": day["restaurants"]},
+            {"name": "others", "title": "OTHER DAYS (do not use)", "priority": 1, "content": ", ".join(others)},
+        ], footer=f"Task: Write Day {day['day']} only.")["prompt"]
+
+    # --- EXECUTION ---
+    def plan(self, state, generate, on_part=None) -> str:
+        """
+        generate(kind, prompt) -> text runs on a bounded thread pool. on_part(text), when
+        given, receives the merged plan piece by piece (header, then each day in order)
+        as soon as every earlier piece is done; the pieces join to the returned plan.
+        """
+        skeleton = self.skeleton(state)
+        jobs = self._jobs(state, skeleton)
+        logger.info(f"Planning {len(skeleton)} days in parallel (concurrency {self.max_concurrency})")
+        parts = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(jobs))) as pool:
+            futures = [submit_in_context(pool, generate, kind, prompt) for kind, prompt in jobs]
+            for index, future in enumerate(futures):
+                parts.append(self._part(index, future.result(), skeleton))
+                if on_part:
+                    on_part(parts[-1])
+        return "".join(parts)
+
+    async def aplan(self, state, agenerate, on_part=None) -> str:
+        """Async counterpart of plan; on_part may be a coroutine function."""
+        skeleton = self.skeleton(state)
+        jobs = self._jobs(state, skeleton)
+        logger.info(f"Planning {len(skeleton)} days in parallel (async, concurrency {self.max_concurrency})")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(kind, prompt):
+            async with semaphore:
+                return await agenerate(kind, prompt)
+
+        tasks = [asyncio.ensure_future(run(kind, prompt)) for kind, prompt in jobs]
+        parts = []
+        try:
+            for index, task in enumerate(tasks):
+                parts.append(self._part(index, await task, skeleton))
+                if on_part:
+                    result = on_part(parts[-1])
+                    if inspect.isawaitable(result):
+                        await result
+        finally:
+            for task in tasks:
+                task.cancel()
+        return "".join(parts)
+
+    def _jobs(self, state, skeleton: list) -> list:
+        return [("header", self.header_prompt(state))] + [("day", self.day_prompt(state, day, skeleton)) for day in skeleton]
+
+    def _part(self, index: int, text: str, skeleton: list) -> str:
+        """Job index 0 is the header, index N is day N."""
+        if index == 0:
+            return self.header_part(text)
+        return self.day_part(skeleton[index - 1], text, last=index == len(skeleton))
+
+    # --- MERGE ---
+    def merge(self, header: str, days: list, skeleton: list) -> str:
+        """Header + "#### 3. Itinerary" + the days in order, each starting at its own "**Day N**" line."""
+        parts = [self.header_part(header)]
+        parts += [self.day_part(day, text, last=index == len(skeleton) - 1) for index, (day, text) in enumerate(zip(skeleton, days))]
+        return "".join(parts)
+
+    def header_part(self, header: str) -> str:
+        header_lines = []
+        for line in (header or "").strip().splitlines():
+            heading = HEADING_PATTERN.match(line)
+            # Drop anything the header call wrote past its own sections
+            if DAY_PATTERN.match(line) or (heading and "itinerary" in heading.group("title").lower()):
+                break
+            header_lines.append(line.rstrip())
+        header = "\n".join(header_lines).strip()
+        return (header + "\n\n" if header else "") + "#### 3. Itinerary\n\n"
+
+    def day_part(self, day: dict, text: str, last: bool = False) -> str:
+        lines = (text or "").strip().splitlines()
+        start = next((index for index, line in enumerate(lines) if DAY_PATTERN.match(line)), None)
+        body = lines[start + 1:] if start is not None else lines
+        title = f"**Day {day['day']}**" + (f" ({day['date']}, {day['city']})" if day["date"] else f" ({day['city']})")
+        body = [line.rstrip() for line in body if line.strip()]
+        return "\n".join([title] + body) + ("\n" if last else "\n\n")
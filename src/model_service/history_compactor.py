@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import RemoveMessage, SystemMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+SUMMARY_MESSAGE_ID = "history_summary"
+
+
+class HistoryCompactor:
+    """
+    Keeps long threads bounded.
+    - compact(): keeps the last N messages verbatim and folds older ones into a
+      single extractive summary message (or drops them in "drop" mode).
+    - prune_checkpoints(): trims stored checkpoint versions of a thread when the
+      checkpointer supports it.
+    Bytes saved are tracked per thread (the most recently active history_stats_max_threads).
+    """
+    def __init__(self, keep_messages: int = None, mode: str = None, summary_max_chars: int = None, keep_checkpoints: int = None, max_stats_threads: int = None):
+        self.keep_messages = keep_messages or settings.history_keep_messages
+        self.mode = mode or settings.history_compaction_mode
+        self.summary_max_chars = summary_max_chars or settings.history_summary_max_chars
+        self.keep_checkpoints = keep_checkpoints or settings.checkpoint_keep_versions
+        self.max_stats_threads = max_stats_threads or settings.history_stats_max_threads
+        self._lock = threading.Lock()
+        self._stats = OrderedDict()  # {thread_id: {...}}, least recently active first
+
+    # --- MESSAGE WINDOW ---
+    def compact(self, messages: list, thread_id: str = None) -> dict:
+        """Return a state update for the messages channel, or {} when nothing needs compacting."""
+        previous_summary = ""
+        if messages and messages[0].id == SUMMARY_MESSAGE_ID:
+            previous_summary = messages[0].content
+            messages = messages[1:]
+        if len(messages) <= self.keep_messages:
+            return {}
+
+        older, recent = messages[:-self.keep_messages], messages[-self.keep_messages:]
+        bytes_before = sum(self._size(message) for message in older) + len(previous_summary.encode())
+
+        new_messages = []
+        if self.mode == "summarize":
+            summary = self._summarize(previous_summary, older)
+            new_messages.append(SystemMessage(content=summary, id=SUMMARY_MESSAGE_ID))
+            bytes_after = len(summary.encode())
+        else:
+            bytes_after = 0
+
+        self._record(thread_id, messages_removed=len(older), message_bytes_saved=bytes_before - bytes_after)
+        logger.info(f"Compacted {len(older)} messages for thread {thread_id} ({bytes_before - bytes_after} bytes saved)")
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *new_messages, *recent]}
+
+    def _summarize(self, previous_summary: str, messages: list) -> str:
+        lines = [previous_summary] if previous_summary else ["Earlier conversation (condensed):"]
+        for message in messages:
+            role = "User" if message.type == "human" else "Assistant"
+            text = " ".join(self._text(message).split())
+            if len(text) > 200:
+                text = text[:200].rsplit(" ", 1)[0] + "..."
+            lines.append(f"- {role}: {text}")
+        summary = "\n".join(lines)
+
+        # Keep the newest part of the summary when it grows past the limit
+        if len(summary) > self.summary_max_chars:
+            summary = "Earlier conversation (condensed):\n..." + summary[-self.summary_max_chars:]
+        return summary
+
+    def _text(self, message) -> str:
+        content = message.content
+        if isinstance(content, list):
+            return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return str(content)
+
+    def _size(self, message) -> int:
+        return len(self._text(message).encode())
+
+    # --- CHECKPOINT VERSIONS ---
+    def prune_checkpoints(self, checkpointer, thread_id: str) -> int:
+        """Trim old checkpoint versions of a thread; returns bytes freed (0 if unsupported)."""
+        if not hasattr(checkpointer, "prune_thread"):
+            return 0
+        freed = checkpointer.prune_thread(thread_id, keep_last=self.keep_checkpoints)
+        self._record(thread_id, checkpoint_bytes_freed=freed)
+        return freed
+
+    # --- METRICS ---
+    def _record(self, thread_id: str, **values):
+        with self._lock:
+            stats = self._stats.setdefault(thread_id, {
+                "compactions": 0,
+                "messages_removed": 0,
+                "message_bytes_saved": 0,
+                "checkpoint_bytes_freed": 0,
+            })
+            if "messages_removed" in values:
+                stats["compactions"] += 1
+            for key, value in values.items():
+                stats[key] += value
+            self._stats.move_to_end(thread_id)
+            while len(self._stats) > self.max_stats_threads:
+                self._stats.popitem(last=False)
+
+    def stats(self, thread_id: str = None) -> dict:
+        with self._lock:
+            if thread_id is not None:
+                return dict(self._stats.get(thread_id, {}))
+            return {thread: dict(values) for thread, values in self._stats.items()}
@@ -0,0 +1,129 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config.settings import settings
+from src.logging.tracing import tracer
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+# "<node>:<tier>" of the model call in progress (set by ModelRouter.track)
+_current_route = contextvars.ContextVar("model_route", default=None)
+
+
+class _UsageRecorder(BaseCallbackHandler):
+    """Adds each model response's token usage to the route that is currently tracked."""
+    def __init__(self, router):
+        self.router = router
+
+    def on_llm_end(self, response, **kwargs):
+        route = _current_route.get()
+        if route is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.router._add_tokens(route, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+class ModelRouter:
+    """
+    Picks the model tier ("fast" = flash_model, "pro" = pro_model) for each node call.
+    Every node has a configured tier in settings (<node>_model_tier); "auto" scores the
+    call on measurable signals: multi-city trip, fresh plan vs revision, input size.
+    Latency and token usage are accounted per "<node>:<tier>" route.
+    """
+    TIERS = ["fast", "pro"]
+    # Nodes without their own tier setting use their parent node's
+    PARENT_NODES = {"itinerary_header": "itinerary", "itinerary_day": "itinerary"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}  # {tier: chat model}
+        self._stats = {}   # {route: {...}}
+        self._recorder = _UsageRecorder(self)
+
+    # --- MODELS ---
+    def model(self, tier: str):
+        """Shared chat model for a tier (created on first use)."""
+        with self._lock:
+            if tier not in self._models:
+                # Imported on first use: the Gemini SDK is the slowest import at startup
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                model_name = settings.pro_model if tier == "pro" else settings.flash_model
+                self._models[tier] = ChatGoogleGenerativeAI(
+                    model=model_name,
+                    temperature=settings.temperature,
+                    max_retries=settings.max_retries,
+                    timeout=settings.request_timeout,
+                    api_key=settings.google_api_key,
+                    callbacks=[self._recorder],
+                )
+            return self._models[tier]
+
+    # --- ROUTING ---
+    def configured(self, node: str) -> str:
+        """The configured tier of a node: "fast", "pro" or "auto"."""
+        tier = getattr(settings, f"{node}_model_tier", None)
+        if not tier and node in self.PARENT_NODES:
+            return self.configured(self.PARENT_NODES[node])
+        return tier or "fast"
+
+    def choose(self, node: str, destinations: int = 1, revision: bool = False, input_chars: int = 0) -> str:
+        configured = self.configured(node)
+        if configured in self.TIERS:
+            return configured
+
+        # "auto": each signal that makes the task harder adds a point
+        score = 0
+        if destinations > 1:
+            score += 1
+        if not revision:
+            score += 1
+        if input_chars >= settings.route_large_input_chars:
+            score += 1
+        tier = "pro" if score >= settings.route_pro_min_score else "fast"
+        logger.info(f"Routed {node} to {tier} (cities={destinations}, revision={revision}, chars={input_chars})")
+        return tier
+
+    # --- ACCOUNTING ---
+    @contextmanager
+    def track(self, node: str, tier: str):
+        """Time the enclosed model call(s) and attribute their token usage to node:tier."""
+        route = f"{node}:{tier}"
+        token = _current_route.set(route)
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"agent:{node}", kind="agent", tier=tier):
+                yield route
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_route.reset(token)
+            with self._lock:
+                stats = self._route_stats(route)
+                stats["calls"] += 1
+                stats["total_seconds"] += elapsed
+
+    def _add_tokens(self, route: str, input_tokens: int, output_tokens: int):
+        with self._lock:
+            stats = self._route_stats(route)
+            stats["input_tokens"] += input_tokens or 0
+            stats["output_tokens"] += output_tokens or 0
+
+    def _route_stats(self, route: str) -> dict:
+        return self._stats.setdefault(route, {"calls": 0, "total_seconds": 0.0, "input_tokens": 0, "output_tokens": 0})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    **values,
+                    "avg_seconds": round(values["total_seconds"] / values["calls"], 3) if values["calls"] else 0.0,
+                }
+                for route, values in self._stats.items()
+            }
@@ -1,4 +1,7 @@
+import asyncio
 import os
+import threading
+import time
 from typing import Literal, List, Optional
 from datetime import datetime
 
@@ -6,61 +9,142 @@ from datetime import datetime
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from src.agents.destination_info_agent import DestinationInfoAgent
 from src.agents.final_trip_planner_agent import FinalTripPlanner
 from src.agents.info_gather_agent import InformationGatherChatbot
 from src.agents.flight_search_agent import FlightSpecialistAgent
+from src.agents.plan_revision_agent import PlanRevisionAgent
 
 from src.tools.attraction_finding_tool import attraction_finding_tool
 from src.tools.hotel_tool import hotel_finding_tool
 from src.tools.restaurant_tool import restaurant_finding_tool
-from src.tools.flight_search_tool import One_way_flight_search
+from src.tools.city_profile_tool import city_profile_tool, city_profile_service
+from src.tools.flight_search_tool import One_way_flight_search, multi_city_flight_search, route_planner
 from src.tools.web_search_tool import web_search_tool
-from src.tools.distance_measurement_tool import distance_measurement_tool
+from src.tools.distance_measurement_tool import distance_measurement_tool, distance_matrix_batch_tool
 from src.tools.time_gather_tool import time_tool
 
 from src.utils.helping_class.conversation_format import ConversationFormat
 from src.utils.http.custom_states import CustomState
+from src.utils.airport_index import airport_index
+from src.utils.validators import date_check
+from src.utils.field_extractor import rule_extractor
 
-from src.prompts.final_trip_planner_prompts import main_agent_system_prompt
+from src.database.checkpointer import build_checkpointer
+from src.model_service.history_compactor import HistoryCompactor
+from src.model_service.model_router import ModelRouter
+from src.model_service.prefetcher import Prefetcher
+from src.model_service.context_packer import ContextPacker
+from src.model_service.revision_engine import RevisionEngine
+from src.model_service.day_planner import ParallelDayPlanner
+from src.logging.tracing import tracer
+from src.prompts.final_trip_planner_prompts import main_agent_system_prompt, plan_header_system_prompt, day_planner_system_prompt
 from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
 
 os.environ["GOOGLE_API_KEY"] = settings.google_api_key
+# The Gemini client reads proxies from the environment (the other APIs use http_transport)
+if settings.http_proxy:
+    os.environ["http_proxy"] = settings.http_proxy
+if settings.https_proxy:
+    os.environ["https_proxy"] = settings.https_proxy
 
 class TravelAutomationSystem:
-    def __init__(self):
+    REQUIRED_FIELDS = ["Departure", "Destination", "StartDate", "Duration", "Budget", "Interest", "ExtraDetail"]
+
+    def __init__(self, lazy: bool = None):
         """
-        Initialize the system ONCE.
-        This sets up the shared model, tools, and the graph definition.
+        Initialize the system ONCE (use get_trip_system() for the shared instance).
+        With lazy=True (settings.lazy_startup) graphs, models and agents are built on
+        first use; otherwise warm_up() builds them all up front.
         """
         # 1. Shared Resources
-        self.checkpointer = InMemorySaver() 
-        self.model = ChatGoogleGenerativeAI(model=settings.flash_model, temperature=0, api_key = settings.google_api_key)
-        self.mainmodel = ChatGoogleGenerativeAI(model=settings.pro_model, temperature=0, api_key = settings.google_api_key)
-        
-        # 2. Initialize Sub-Agents (Shared Instances)
-        self.info_gather_agent = InformationGatherChatbot(self.model, ConversationFormat, [time_tool])
-        self.flight_agent = FlightSpecialistAgent(self.model, [One_way_flight_search])
-        self.trip_advisor_agent = DestinationInfoAgent(self.model, [attraction_finding_tool, hotel_finding_tool, restaurant_finding_tool])
-        self.travel_partner = FinalTripPlanner(self.mainmodel, [web_search_tool, distance_measurement_tool], main_agent_system_prompt)
+        self.checkpointer = build_checkpointer()
+        self.history_compactor = HistoryCompactor()
+        self.router = ModelRouter()
+        self.prefetcher = Prefetcher()
+        self.context_packer = ContextPacker()
+        self.revision_engine = RevisionEngine()
+        self.day_planner = ParallelDayPlanner(self.context_packer)
+
+        # 2. Sub-Agents: one shared instance per (node, model tier), built on first use
+        self._agent_factories = {
+            "gather_info": lambda model: InformationGatherChatbot(model, ConversationFormat, [time_tool]),
+            "flights": lambda model: FlightSpecialistAgent(model, [One_way_flight_search, multi_city_flight_search]),
+            "destinations": lambda model: DestinationInfoAgent(model, [attraction_finding_tool, hotel_finding_tool, restaurant_finding_tool, city_profile_tool]),
+            "itinerary": lambda model: FinalTripPlanner(model, [web_search_tool, distance_measurement_tool, distance_matrix_batch_tool], main_agent_system_prompt),
+            "revision": lambda model: PlanRevisionAgent(model),
+            "itinerary_header": lambda model: FinalTripPlanner(model, [web_search_tool], plan_header_system_prompt),
+            "itinerary_day": lambda model: FinalTripPlanner(model, [distance_matrix_batch_tool, distance_measurement_tool], day_planner_system_prompt),
+        }
+        self._agents = {}
+
+        # 3. Graphs (sync for run_trip_planner, async for arun_trip_planner), compiled on first use
+        self._lock = threading.Lock()
+        self._app = None
+        self._async_app = None
+
+        lazy = settings.lazy_startup if lazy is None else lazy
+        if not lazy:
+            self.warm_up()
+
+    @property
+    def app(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = self._build_workflow()
+        return self._app
+
+    @property
+    def async_app(self):
+        if self._async_app is None:
+            with self._lock:
+                if self._async_app is None:
+                    self._async_app = self._build_workflow(use_async=True)
+        return self._async_app
 
-        # 3. Build the Graph
-        self.app = self._build_workflow()
+    def warm_up(self) -> dict:
+        """Build everything that is otherwise created on first use. Returns seconds per step."""
+        timings = {}
 
-    def _build_workflow(self):
+        def timed(step, build):
+            start = time.perf_counter()
+            build()
+            timings[step] = round(time.perf_counter() - start, 4)
+
+        timed("graphs", lambda: (self.app, self.async_app))
+        timed("airport_index", airport_index.load)
+        for node in self._agent_factories:
+            configured = self.router.configured(node)
+            for tier in (self.router.TIERS if configured == "auto" else [configured]):
+                timed(f"agent:{node}:{tier}", lambda: self._agent(node, tier))
+        print(f"--- Travel system warmed up in {sum(timings.values()):.2f}s ---")
+        return timings
+
+    def _build_workflow(self, use_async: bool = False):
         """
         Constructs the LangGraph workflow.
+        With use_async=True the nodes are coroutines, so the flight and hotel
+        branches (and their tool calls) overlap on one event loop.
         """
         workflow = StateGraph(CustomState)
         
-        # Register Nodes
-        workflow.add_node("gather_info_node", self.gather_info_node)
-        workflow.add_node("search_flights", self.flight_node)
-        workflow.add_node("search_hotels", self.accommodation_node)
-        workflow.add_node("compile_itinerary", self.itinerary_compiler_node)
+        # Register Nodes (each wrapped in a tracing span)
+        if use_async:
+            workflow.add_node("gather_info_node", self._traced_async("gather_info_node", self.agather_info_node))
+            workflow.add_node("search_flights", self._traced_async("search_flights", self.aflight_node))
+            workflow.add_node("search_hotels", self._traced_async("search_hotels", self.aaccommodation_node))
+            workflow.add_node("compile_itinerary", self._traced_async("compile_itinerary", self.aitinerary_compiler_node))
+        else:
+            workflow.add_node("gather_info_node", self._traced("gather_info_node", self.gather_info_node))
+            workflow.add_node("search_flights", self._traced("search_flights", self.flight_node))
+            workflow.add_node("search_hotels", self._traced("search_hotels", self.accommodation_node))
+            workflow.add_node("compile_itinerary", self._traced("compile_itinerary", self.itinerary_compiler_node))
+        workflow.add_node("compact_history", self._traced("compact_history", self.compact_history_node))
 
         # Register Edges & Conditions
         workflow.add_conditional_edges(
@@ -72,16 +156,47 @@ class TravelAutomationSystem:
         workflow.add_conditional_edges(
             "gather_info_node", 
             self.conditional_move, 
-            ["search_flights", "search_hotels", END]
+            ["search_flights", "search_hotels", "compact_history"]
         )
         
         workflow.add_edge("search_flights", "compile_itinerary")
         workflow.add_edge("search_hotels", "compile_itinerary")
-        workflow.add_edge("compile_itinerary", END)
+        workflow.add_edge("compile_itinerary", "compact_history")
+        workflow.add_edge("compact_history", END)
         
         # Compile with the shared checkpointer
         return workflow.compile(checkpointer=self.checkpointer)
 
+    def _traced(self, name: str, node):
+        def traced_node(state: CustomState, config: RunnableConfig):
+            with tracer.span(name, kind="node"):
+                return node(state, config)
+        return traced_node
+
+    def _traced_async(self, name: str, node):
+        async def traced_node(state: CustomState, config: RunnableConfig):
+            with tracer.span(name, kind="node"):
+                return await node(state, config)
+        return traced_node
+
+    def _agent(self, node: str, tier: str):
+        """The sub-agent for a node, bound to the routed model tier."""
+        key = (node, tier)
+        if key not in self._agents:
+            # Parallel day planning asks for the same agent from several threads at once
+            with self._lock:
+                if key not in self._agents:
+                    self._agents[key] = self._agent_factories[node](self.router.model(tier))
+        return self._agents[key]
+
+    def _route(self, node: str, state: CustomState, input_chars: int = 0):
+        return self.router.choose(
+            node,
+            destinations=len(self._destination_list(state)),
+            revision=state.get("TravelMode") == "Revision_Plan",
+            input_chars=input_chars,
+        )
+
     # --- HELPER FOR UPDATES ---
     def _send_update(self, config: RunnableConfig, message: str):
         """Helper to send status updates if a callback exists in config."""
@@ -90,6 +205,12 @@ class TravelAutomationSystem:
             if on_update:
                 on_update(message)
 
+    def _token_callback(self, config: RunnableConfig):
+        """The on_token callback from config (None when the caller does not stream)."""
+        if config and "configurable" in config:
+            return config["configurable"].get("on_token")
+        return None
+
     # --- NODE IMPLEMENTATIONS ---
 
     def gather_info_node(self, state: CustomState, config: RunnableConfig):
@@ -97,25 +218,109 @@ class TravelAutomationSystem:
         print("--- Gathering Info Node ---")
         
         # 1. Get User Input
+        user_input = self._latest_user_input(state)
+        if user_input is None:
+            return {"messages": [AIMessage(content="Error: No messages found.")]}
+
+        # 2. Identify what is CURRENTLY missing
+        current_missing = self._missing_fields(state)
+                
+        # 3. Short, unambiguous answers are parsed locally; everything else goes to the chatbot
+        extracted_data = self._fast_path(user_input, current_missing)
+        if extracted_data is None:
+            tier = self._route("gather_info", state, input_chars=len(str(user_input)))
+            with self.router.track("gather_info", tier):
+                extracted_data = self._agent("gather_info", tier).ask(user_input, missing_list=current_missing)
+        
+        updates = self._merge_extracted_data(state, extracted_data)
+        self._schedule_prefetch({**state, **updates}, config)
+        return updates
+
+    async def agather_info_node(self, state: CustomState, config: RunnableConfig):
+        self._send_update(config, "🤖 Analyzing your request...")
+        print("--- Gathering Info Node (async) ---")
+
+        user_input = self._latest_user_input(state)
+        if user_input is None:
+            return {"messages": [AIMessage(content="Error: No messages found.")]}
+
+        current_missing = self._missing_fields(state)
+        extracted_data = self._fast_path(user_input, current_missing)
+        if extracted_data is None:
+            tier = self._route("gather_info", state, input_chars=len(str(user_input)))
+            with self.router.track("gather_info", tier):
+                extracted_data = await self._agent("gather_info", tier).aask(user_input, missing_list=current_missing)
+
+        updates = self._merge_extracted_data(state, extracted_data)
+        self._schedule_prefetch({**state, **updates}, config)
+        return updates
+
+    def _fast_path(self, user_input, current_missing):
+        """Rule-based extraction, or None when the LLM is needed."""
+        if not settings.fast_path_enabled:
+            return None
+        try:
+            extracted_data = rule_extractor.extract(user_input, current_missing)
+        except Exception as e:
+            # The fast path is only an optimisation: any failure falls back to the LLM
+            logger.warning(f"Fast path failed, falling back to the LLM: {e}")
+            return None
+        if extracted_data is not None:
+            print("--- Gather info answered by the rule-based fast path ---")
+        return extracted_data
+
+    def _schedule_prefetch(self, state: CustomState, config: RunnableConfig):
+        """
+        Start flight and destination lookups in the background as soon as their fields
+        are known, so the plan is mostly fetched by the time the last question is answered.
+        """
+        thread_id = self._thread_id(config)
+        if not settings.prefetch_enabled or thread_id is None:
+            return
+        destinations = self._destination_list(state)
+        if destinations and not self._is_empty(destinations):
+            self.prefetcher.submit(thread_id, "destinations", tuple(destinations),
+                                   lambda: city_profile_service.execute(destinations))
+        if state.get('Departure') and destinations:
+            route = self._resolve_flight_route(state)
+            if route:
+                departure_id, arrival_ids = route
+                self.prefetcher.submit(thread_id, "flights", (departure_id, tuple(arrival_ids), state['StartDate']),
+                                       lambda: route_planner.execute(departure_id, arrival_ids, state['StartDate']))
+
+    def _end_prefetch(self, thread_id: str, final_state):
+        """Prefetches live across gather turns; once a plan was built (or the run failed) they are dropped."""
+        if final_state.get("AllDetails") is True or final_state.get("TravelMode") == "Revision_Plan":
+            self.prefetcher.discard(thread_id)
+
+    def _is_empty(self, values):
+        return all(str(value).lower() in ["none", "null", ""] for value in values)
+
+    def _thread_id(self, config: RunnableConfig):
+        if config and "configurable" in config:
+            return config["configurable"].get("thread_id")
+        return None
+
+    def _latest_user_input(self, state: CustomState):
         messages = state.get("messages", [])
         if not messages:
-            return {"messages": [AIMessage(content="Error: No messages found.")]}
+            return None
         
         last_message = messages[-1]
-        user_input = last_message.content if hasattr(last_message, 'content') else last_message['content']
+        return last_message.content if hasattr(last_message, 'content') else last_message['content']
 
-        # 2. Identify what is CURRENTLY missing
-        required_fields = ["Departure", "Destination", "StartDate", "Duration", "Budget", "Interest", "ExtraDetail"]
+    def _missing_fields(self, state: CustomState):
         current_missing = []
         
-        for field in required_fields:
+        for field in self.REQUIRED_FIELDS:
             val = state.get(field)
             if val is None or val in ["None", "Null", "null"] or (isinstance(val, list) and (len(val) == 0 or val == ['None'])):
                 current_missing.append(field)
-                
-        # 3. Call Chatbot
-        extracted_data = self.info_gather_agent.ask(user_input, missing_list=current_missing)
-        
+        return current_missing
+
+    def _merge_extracted_data(self, state: CustomState, extracted_data: dict):
+        required_fields = self.REQUIRED_FIELDS
+
         # 4. MERGE LOGIC
         final_updates = {}
         for field in required_fields:
@@ -172,36 +377,265 @@ class TravelAutomationSystem:
         self._send_update(config, "✈️  Searching for the best flights...")
         if not state.get('Departure') or not state.get('Destination'):
             return {"flight_info": "Flight details skipped due to missing info."}
-        
-        dest = state['Destination'][0] if isinstance(state['Destination'], list) else state['Destination']
-        prompt = f"Find one-way flights from {state['Departure']} to {dest} on {state['StartDate']}. Provide a summary."
-        
+
+        tier = self._route("flights", state)
+        route = self._resolve_flight_route(state)
+        if route:
+            # Codes resolved locally: search every leg directly, then one summary call
+            departure_id, arrival_ids = route
+            print(f"--- Flight Node (Direct Search) {departure_id} -> {arrival_ids} ---")
+            flights = self.prefetcher.take(self._thread_id(config), "flights", (departure_id, tuple(arrival_ids), state['StartDate']))
+            if flights is None:
+                flights = route_planner.execute(departure_id, arrival_ids, state['StartDate'])
+            flight_options = route_planner.options(flights)
+            if settings.summarize_flight_info:
+                with self.router.track("flights", tier):
+                    flight_content = self._agent("flights", tier).summarize(flights)
+            else:
+                flight_content = route_planner.format_report(flights, flight_options)
+            print("Flight Info Captured.")
+            return {"flight_info": flight_content, "flight_options": flight_options}
+
+        dest, prompt = self._flight_prompt(state)
+
         print(f"--- Flight Node (Running) for {dest} ---")
-        result = self.flight_agent.invoke({"messages": [{"role": "user", "content": prompt}]})
+        with self.router.track("flights", tier):
+            result = self._agent("flights", tier).invoke({"messages": [{"role": "user", "content": prompt}]})
         flight_content = result.get("messages")[-1].content[0].get('text')
         print("Flight Info Captured.") 
-        return {"flight_info": flight_content}
+        # The agent's tool loop only returns prose, so no records from an earlier turn are kept
+        return {"flight_info": flight_content, "flight_options": []}
+
+    async def aflight_node(self, state: CustomState, config: RunnableConfig):
+        self._send_update(config, "✈️  Searching for the best flights...")
+        if not state.get('Departure') or not state.get('Destination'):
+            return {"flight_info": "Flight details skipped due to missing info."}
+
+        tier = self._route("flights", state)
+        route = self._resolve_flight_route(state)
+        if route:
+            departure_id, arrival_ids = route
+            print(f"--- Flight Node (Direct Search, async) {departure_id} -> {arrival_ids} ---")
+            flights = await self.prefetcher.atake(self._thread_id(config), "flights", (departure_id, tuple(arrival_ids), state['StartDate']))
+            if flights is None:
+                flights = await route_planner.aexecute(departure_id, arrival_ids, state['StartDate'])
+            flight_options = route_planner.options(flights)
+            if settings.summarize_flight_info:
+                with self.router.track("flights", tier):
+                    flight_content = await self._agent("flights", tier).asummarize(flights)
+            else:
+                flight_content = route_planner.format_report(flights, flight_options)
+            print("Flight Info Captured.")
+            return {"flight_info": flight_content, "flight_options": flight_options}
+
+        dest, prompt = self._flight_prompt(state)
+
+        print(f"--- Flight Node (async) for {dest} ---")
+        with self.router.track("flights", tier):
+            result = await self._agent("flights", tier).ainvoke({"messages": [{"role": "user", "content": prompt}]})
+        flight_content = result.get("messages")[-1].content[0].get('text')
+        print("Flight Info Captured.")
+        return {"flight_info": flight_content, "flight_options": []}
+
+    def _resolve_flight_route(self, state: CustomState):
+        """
+        Resolve Departure/Destination to airport codes with the local index.
+        Returns (departure_id, [arrival_ids]) or None when the LLM has to work it out.
+        """
+        if not settings.flight_direct_search:
+            return None
+        if not state.get('StartDate') or not date_check(str(state['StartDate'])):
+            return None
+        departure = airport_index.resolve(state['Departure'])
+        arrivals = [airport_index.resolve(place) for place in self._destination_list(state)]
+        if not departure or not arrivals or not all(arrivals):
+            return None
+        return departure["code"], [arrival["code"] for arrival in arrivals]
+
+    def _flight_prompt(self, state: CustomState):
+        destinations = self._destination_list(state)
+        if len(destinations) > 1:
+            dest = ", ".join(destinations)
+            prompt = f"Find one-way flights from {state['Departure']} to all of [{dest}] (every route leg) on {state['StartDate']}. Provide a summary."
+        else:
+            dest = destinations[0]
+            prompt = f"Find one-way flights from {state['Departure']} to {dest} on {state['StartDate']}. Provide a summary."
+
+        # Hand over whatever the local airport index could already resolve
+        known_codes = []
+        for place in [state['Departure'], *destinations]:
+            resolution = airport_index.resolve(place)
+            if resolution:
+                known_codes.append(f"{place}={resolution['code']}")
+        if known_codes:
+            prompt += f" Known airport codes: {', '.join(known_codes)}."
+        return dest, prompt
 
     def accommodation_node(self, state: CustomState, config: RunnableConfig):
         self._send_update(config, "🏨  Searching for hotels and attractions...")
         print("--- Hotel, Restaurant and Attraction Node (Running) ---")
-        prompt = f"I'm going to {state.get('Destination')} for {state.get('Duration')} days."
-        result = self.trip_advisor_agent.invoke({"messages": [{"role": "user", "content": prompt}]})
-        hotel_content = result.get("messages")[-1].content[0].get('text')
-        print(f"Hotel Content: {result}")
+        tier = self._route("destinations", state)
+        destinations = self._destination_list(state)
+        # Speculative prefetch from gather_info (also warms the tool cache for the LLM tool loop)
+        profiles = self.prefetcher.take(self._thread_id(config), "destinations", tuple(destinations))
+        if settings.destination_batch_mode:
+            # Pre-fetch stage: call the TripAdvisor services for every destination up front,
+            # then (optionally) one summarization call instead of an LLM tool loop
+            if profiles is None:
+                profiles = city_profile_service.execute(destinations)
+            places = city_profile_service.places(profiles)
+            if settings.summarize_destination_info:
+                with self.router.track("destinations", tier):
+                    hotel_content = self._agent("destinations", tier).summarize(destinations, state.get('Duration'), profiles)
+            else:
+                hotel_content = city_profile_service.format_report(profiles)
+        else:
+            places = []
+            with self.router.track("destinations", tier):
+                result = self._agent("destinations", tier).invoke(self._accommodation_prompt(state))
+            hotel_content = result.get("messages")[-1].content[0].get('text')
+            print(f"Hotel Content: {result}")
         print("Accommodation Info Captured.")
-        return {"hotel_info": hotel_content}
+        return {"hotel_info": hotel_content, "places": places}
+
+    async def aaccommodation_node(self, state: CustomState, config: RunnableConfig):
+        self._send_update(config, "🏨  Searching for hotels and attractions...")
+        print("--- Hotel, Restaurant and Attraction Node (async) ---")
+        tier = self._route("destinations", state)
+        destinations = self._destination_list(state)
+        profiles = await self.prefetcher.atake(self._thread_id(config), "destinations", tuple(destinations))
+        if settings.destination_batch_mode:
+            if profiles is None:
+                profiles = await city_profile_service.aexecute(destinations)
+            places = city_profile_service.places(profiles)
+            if settings.summarize_destination_info:
+                with self.router.track("destinations", tier):
+                    hotel_content = await self._agent("destinations", tier).asummarize(destinations, state.get('Duration'), profiles)
+            else:
+                hotel_content = city_profile_service.format_report(profiles)
+        else:
+            places = []
+            with self.router.track("destinations", tier):
+                result = await self._agent("destinations", tier).ainvoke(self._accommodation_prompt(state))
+            hotel_content = result.get("messages")[-1].content[0].get('text')
+        print("Accommodation Info Captured.")
+        return {"hotel_info": hotel_content, "places": places}
+
+    def _accommodation_prompt(self, state: CustomState):
+        prompt = f"I'm going to {state.get('Destination')} for {state.get('Duration')} days."
+        return {"messages": [{"role": "user", "content": prompt}]}
+
+    def _destination_list(self, state: CustomState):
+        destination = state.get('Destination') or []
+        return destination if isinstance(destination, list) else [destination]
 
     def itinerary_compiler_node(self, state: CustomState, config: RunnableConfig):
+        revision = self._revision_request(state)
+        if revision:
+            # Only the sections the concern touches are rewritten, then spliced back
+            sections, targets, prompt = revision
+            self._send_update(config, "✏️  Updating the affected parts of your plan...")
+            tier = self.router.choose("revision")
+            print(f"--- Revising Sections {targets} ---")
+            with self.router.track("revision", tier):
+                response = self._agent("revision", tier).revise(prompt)
+            result = self._revision_result(sections, targets, response)
+            if result:
+                return result
+
+        if self.day_planner.applies(state):
+            # One call per day (plus the header), all in flight at once; streamed in day order
+            self._send_update(config, "📝  Planning each day of your trip...")
+            print(f"--- Planning {self.day_planner.days(state)} Days in Parallel ---")
+            tiers = self._day_planning_tiers(state)
+            tracer.annotate(parallel_days=self.day_planner.days(state))
+            plan = self.day_planner.plan(state, lambda kind, prompt: self._plan_part(kind, tiers[kind], prompt),
+                                         on_part=self._token_callback(config))
+            return self._itinerary_result(plan)
+
+        self._send_update(config, "📝  Compiling your final itinerary...")
+        input_payload = self._itinerary_payload(state)
+        tier = self._route("itinerary", state, input_chars=self._payload_chars(input_payload))
+        travel_partner = self._agent("itinerary", tier)
+
+        on_token = self._token_callback(config)
+        with self.router.track("itinerary", tier):
+            if on_token:
+                print("--- Streaming Final Itinerary ---")
+                result = travel_partner.stream(input_payload, on_token)
+            else:
+                print("--- Compiling Final Itinerary ---")
+                result = travel_partner.invoke(input_payload)
+        return self._itinerary_result(result)
+
+    async def aitinerary_compiler_node(self, state: CustomState, config: RunnableConfig):
+        revision = self._revision_request(state)
+        if revision:
+            sections, targets, prompt = revision
+            self._send_update(config, "✏️  Updating the affected parts of your plan...")
+            tier = self.router.choose("revision")
+            print(f"--- Revising Sections {targets} (async) ---")
+            with self.router.track("revision", tier):
+                response = await self._agent("revision", tier).arevise(prompt)
+            result = self._revision_result(sections, targets, response)
+            if result:
+                return result
+
+        if self.day_planner.applies(state):
+            self._send_update(config, "📝  Planning each day of your trip...")
+            print(f"--- Planning {self.day_planner.days(state)} Days in Parallel (async) ---")
+            tiers = self._day_planning_tiers(state)
+            tracer.annotate(parallel_days=self.day_planner.days(state))
+            plan = await self.day_planner.aplan(state, lambda kind, prompt: self._aplan_part(kind, tiers[kind], prompt),
+                                                on_part=self._token_callback(config))
+            return self._itinerary_result(plan)
+
+        self._send_update(config, "📝  Compiling your final itinerary...")
+        input_payload = self._itinerary_payload(state)
+        tier = self._route("itinerary", state, input_chars=self._payload_chars(input_payload))
+        travel_partner = self._agent("itinerary", tier)
+
+        on_token = self._token_callback(config)
+        with self.router.track("itinerary", tier):
+            if on_token:
+                print("--- Streaming Final Itinerary (async) ---")
+                result = await travel_partner.astream(input_payload, on_token)
+            else:
+                print("--- Compiling Final Itinerary (async) ---")
+                result = await travel_partner.ainvoke(input_payload)
+        return self._itinerary_result(result)
+
+    def _day_planning_tiers(self, state: CustomState) -> dict:
+        """Tiers of the header and per-day calls (the itinerary tier unless configured separately)."""
+        return {kind: self._route(f"itinerary_{kind}", state) for kind in ["header", "day"]}
+
+    def _plan_part(self, kind: str, tier: str, prompt: str) -> str:
+        """One parallel planning call: kind is "header" or "day"."""
+        node = f"itinerary_{kind}"
+        with self.router.track(node, tier):
+            result = self._agent(node, tier).invoke({"messages": [{"role": "user", "content": prompt}]})
+        return self._result_text(result)
+
+    async def _aplan_part(self, kind: str, tier: str, prompt: str) -> str:
+        node = f"itinerary_{kind}"
+        with self.router.track(node, tier):
+            result = await self._agent(node, tier).ainvoke({"messages": [{"role": "user", "content": prompt}]})
+        return self._result_text(result)
+
+    def _payload_chars(self, input_payload: dict) -> int:
+        return sum(len(str(message["content"])) for message in input_payload["messages"])
+
+    def _itinerary_payload(self, state: CustomState):
         print(f"""
 
         DATA SOURCE 1 (Flights): {state.get('flight_info')}
         DATA SOURCE 2 (Hotels): {state.get('hotel_info')}
 
         """)
-        self._send_update(config, "📝  Compiling your final itinerary...")
         # 1. Prepare Prompt based on mode
-        if state.get("TravelMode") == "Travel_Plan":
+        if settings.context_packing_enabled:
+            prompt = self._packed_prompt(state)
+        elif state.get("TravelMode") == "Travel_Plan":
             prompt = f"""
             I want to go to {state['Destination']} from {state['Departure']} for {state['Duration']}. 
             Start: {state['StartDate']}. Interests: {state['Interest']}. Budget: {state['Budget']} 
@@ -214,41 +648,123 @@ class TravelAutomationSystem:
             """
         else:
             # Revision Logic
-            last_message = state['messages'][-1]
-            user_input = last_message.content if hasattr(last_message, 'content') else last_message['content']
+            user_input = self._latest_user_input(state)
             prompt = f"""
             Fix the plan based on this concern: {user_input}
             Previous Plan: {state.get("previous_plan")}
             """
 
-        print("--- Streaming Final Itinerary ---")
-        
-        input_payload = {
+        return {
             "messages": [{"role": "user", "content": prompt}],
             "task_mode": state.get("TravelMode", "Travel_Plan")
         }
-        
-        result = self.travel_partner.invoke(input_payload)
-        
+
+    def _packed_prompt(self, state: CustomState) -> str:
+        """Compact, token-budgeted prompt (see ContextPacker); the trip request and the concern are never trimmed."""
+        if state.get("TravelMode") == "Travel_Plan":
+            sections = [
+                {"name": "trip", "title": "TRIP REQUEST", "priority": 0, "content": {
+                    "From": state.get('Departure'),
+                    "To": state.get('Destination'),
+                    "Start date": state.get('StartDate'),
+                    "Duration (days)": state.get('Duration'),
+                    "Budget": state.get('Budget'),
+                    "Interests": state.get('Interest'),
+                    "Extra": state.get('ExtraDetail'),
+                }},
+                # Structured records when the direct searches produced them, the agents' prose otherwise
+                {"name": "flights", "title": "DATA SOURCE 1 (Flights)", "priority": 1, "content": state.get('flight_options') or state.get('flight_info')},
+                {"name": "hotels", "title": "DATA SOURCE 2 (Hotels)", "priority": 1, "content": state.get('places') or state.get('hotel_info')},
+            ]
+            footer = "Task: Combine this into a final formatted itinerary report."
+        else:
+            sections = [
+                {"name": "concern", "title": "CONCERN", "priority": 0, "content": self._latest_user_input(state)},
+                # Never trimmed: a plan cut short would lose its last days in the revision
+                {"name": "previous_plan", "title": "PREVIOUS PLAN", "priority": 0, "content": state.get("previous_plan"), "verbatim": True},
+            ]
+            footer = "Task: Fix the plan based on this concern."
+
+        packed = self.context_packer.pack(sections, footer=footer)
+        tracer.annotate(context_tokens=packed["tokens"], context_tokens_before=packed["tokens_before"])
+        return packed["prompt"]
+
+    def _revision_request(self, state: CustomState):
+        """(sections, target ids, prompt) for a section-level revision, or None for a full regeneration."""
+        if state.get("TravelMode") != "Revision_Plan" or not settings.diff_revision_enabled:
+            return None
+        previous_plan = state.get("previous_plan")
+        if not previous_plan:
+            return None
+        sections = state.get("plan_sections")
+        if not sections or self.revision_engine.join(sections) != previous_plan:
+            sections = self.revision_engine.split(previous_plan)
+
+        concern = self._latest_user_input(state)
+        targets = self.revision_engine.targets(concern, sections)
+        if targets is None:
+            self.revision_engine.record()
+            return None
+
+        to_rewrite = "\n".join(
+            f"=== SECTION {section['id']} ===\n{section['text'].strip()}"
+            for section in sections if section["id"] in targets
+        )
+        packed = self.context_packer.pack([
+            {"name": "concern", "title": "CONCERN", "priority": 0, "content": concern},
+            {"name": "sections", "title": "SECTIONS TO REWRITE", "priority": 0, "content": to_rewrite, "verbatim": True},
+            {"name": "used", "title": "USED ELSEWHERE", "priority": 1, "content": ", ".join(self.revision_engine.names_outside(sections, targets))},
+            {"name": "places", "title": "AVAILABLE PLACES", "priority": 2, "content": state.get('places') or state.get('hotel_info')},
+        ], footer=f"Task: Rewrite sections {', '.join(targets)} for this concern.")
+        tracer.annotate(revision_sections=targets, context_tokens=packed["tokens"])
+        return sections, targets, packed["prompt"]
+
+    def _revision_result(self, sections: list, targets: list, response: str):
+        """Splice the rewritten sections into the plan; None when the response cannot be used."""
+        revised = self.revision_engine.parse_revision(response, targets)
+        if revised is None:
+            self.revision_engine.record()
+            return None
+        plan_sections = self.revision_engine.splice(sections, revised)
+        full_response = self.revision_engine.join(plan_sections)
+        self.revision_engine.record(sections_revised=len(targets))
+        return {
+            "messages": [AIMessage(content=full_response)],
+            "previous_plan": full_response,
+            "plan_sections": plan_sections
+        }
+
+    def _result_text(self, result) -> str:
         if isinstance(result, dict) and 'messages' in result:
              full_response = result['messages'][-1].content
              if isinstance(full_response, list): 
                  full_response = full_response[0]['text']
         else:
             full_response = str(result)
+        return full_response
 
+    def _itinerary_result(self, result):
+        full_response = self._result_text(result)
         return {
             "messages": [AIMessage(content=full_response)], 
-            "previous_plan": full_response
+            "previous_plan": full_response,
+            "plan_sections": self.revision_engine.split(full_response)
         }
 
+    def compact_history_node(self, state: CustomState, config: RunnableConfig):
+        """Last step of every turn: keep the message window bounded."""
+        if not settings.history_compaction_enabled:
+            return {}
+        thread_id = config.get("configurable", {}).get("thread_id") if config else None
+        return self.history_compactor.compact(state.get("messages", []), thread_id=thread_id)
+
     # --- CONDITIONAL LOGIC ---
 
     def conditional_move(self, state: CustomState, config: RunnableConfig):
         if state.get("AllDetails") is True:
             self._send_update(config, "All_Details_Fetched")
             return ["search_flights", "search_hotels"]
-        return END
+        return "compact_history"
 
     def node_switch_condition(self, state: CustomState):
         if state.get("move_to_info_chatbot") is True or state.get("TravelMode") == "Revision_Plan":
@@ -257,17 +773,20 @@ class TravelAutomationSystem:
 
     # --- PUBLIC API ---
 
-    def run_trip_planner(self, user_id: str, user_input: str, mode: str = "Travel_Plan", on_update=None):
+    def run_trip_planner(self, user_id: str, user_input: str, mode: str = "Travel_Plan", on_update=None, on_token=None):
         """
         The main entry point for your API or UI.
-        Accepts an optional on_update callback.
+        Accepts an optional on_update callback, and an optional on_token callback
+        that receives the final itinerary token by token.
         """
-        # Inject the callback into 'configurable'
+        # Inject the callbacks into 'configurable'
         config = {
             "configurable": {
                 "thread_id": user_id,
-                "on_update": on_update
-            }
+                "on_update": on_update,
+                "on_token": on_token
+            },
+            "callbacks": [tracer.callback]
         }
         
         initial_state = {
@@ -276,9 +795,62 @@ class TravelAutomationSystem:
         }
         
         # Run the graph
-        final_state = self.app.invoke(initial_state, config=config)
+        with tracer.trace(user_id, name=f"run_trip_planner:{mode}"):
+            try:
+                final_state = self.app.invoke(initial_state, config=config)
+            except Exception:
+                self.prefetcher.discard(user_id)
+                raise
+            self._end_prefetch(user_id, final_state)
+            if settings.history_compaction_enabled:
+                with tracer.span("prune_checkpoints"):
+                    self.history_compactor.prune_checkpoints(self.checkpointer, user_id)
         
         # Return the last message
         return final_state['messages'][-1].content
 
-trip_system = TravelAutomationSystem()
\ No newline at end of file
+    async def arun_trip_planner(self, user_id: str, user_input: str, mode: str = "Travel_Plan", on_update=None, on_token=None):
+        """
+        Async entry point: drives the graph with ainvoke on the caller's event loop
+        instead of pinning a worker thread for the whole plan.
+        on_token may be a coroutine function (e.g. a WebSocket send).
+        """
+        config = {
+            "configurable": {
+                "thread_id": user_id,
+                "on_update": on_update,
+                "on_token": on_token
+            },
+            "callbacks": [tracer.callback]
+        }
+        
+        initial_state = {
+            "messages": [{"role": "user", "content": user_input}],
+            "TravelMode": mode
+        }
+        
+        with tracer.trace(user_id, name=f"arun_trip_planner:{mode}"):
+            try:
+                final_state = await self.async_app.ainvoke(initial_state, config=config)
+            except (Exception, asyncio.CancelledError):
+                self.prefetcher.discard(user_id)
+                raise
+            self._end_prefetch(user_id, final_state)
+            if settings.history_compaction_enabled:
+                with tracer.span("prune_checkpoints"):
+                    await asyncio.to_thread(self.history_compactor.prune_checkpoints, self.checkpointer, user_id)
+        return final_state['messages'][-1].content
+
+
+_trip_system = None
+_trip_system_lock = threading.Lock()
+
+
+def get_trip_system() -> TravelAutomationSystem:
+    """The process-wide TravelAutomationSystem (created on the first call)."""
+    global _trip_system
+    if _trip_system is None:
+        with _trip_system_lock:
+            if _trip_system is None:
+                _trip_system = TravelAutomationSystem()
+    return _trip_system
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+
+class Prefetcher:
+    """
+    Per-thread speculative prefetch cache.
+    gather_info submits fetches (flights, destination profiles) as soon as their inputs
+    are known; flight_node / accommodation_node take the result if it was fetched for
+    the same inputs, otherwise they fetch as usual. A newer submit for the same
+    (thread, kind) with different inputs replaces the stale one.
+    Threads are dropped once their entries are taken or discarded (end of a planning run);
+    abandoned ones are swept after ttl_seconds, or oldest first beyond max_threads.
+    """
+    def __init__(self, max_workers: int = None, wait_seconds: float = None, ttl_seconds: float = None, max_threads: int = None):
+        self.wait_seconds = wait_seconds if wait_seconds is not None else settings.prefetch_wait_seconds
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.prefetch_ttl_seconds
+        self.max_threads = max_threads or settings.prefetch_max_threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.prefetch_max_workers,
+            thread_name_prefix="prefetch",
+        )
+        self._lock = threading.Lock()
+        self._entries = {}  # {thread_id: {kind: (key, future)}}
+        self._touched = {}  # {thread_id: monotonic time of the last submit}
+        self._stats = {"submitted": 0, "hits": 0, "misses": 0, "stale": 0, "evicted": 0}
+
+    def submit(self, thread_id: str, kind: str, key, fetch) -> bool:
+        """Start fetch() in the background unless the same key is already pending. True when submitted."""
+        with self._lock:
+            self._sweep(thread_id)
+            self._touched[thread_id] = time.monotonic()
+            entries = self._entries.setdefault(thread_id, {})
+            current = entries.get(kind)
+            if current and current[0] == key:
+                return False
+            if current:
+                current[1].cancel()
+                self._stats["stale"] += 1
+            entries[kind] = (key, self._executor.submit(self._run, kind, key, fetch))
+            self._stats["submitted"] += 1
+        logger.info(f"Prefetching {kind} for {thread_id}: {key}")
+        return True
+
+    def take(self, thread_id: str, kind: str, key):
+        """The prefetched result for exactly this key (waiting for it if still running), else None."""
+        future = self._pop(thread_id, kind, key)
+        if future is None:
+            return None
+        try:
+            return self._count(future.result(timeout=self.wait_seconds))
+        except (FutureTimeoutError, Exception) as e:
+            logger.warning(f"Prefetched {kind} for {thread_id} unusable: {e}")
+            return self._count(None)
+
+    async def atake(self, thread_id: str, kind: str, key):
+        future = self._pop(thread_id, kind, key)
+        if future is None:
+            return None
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.wait_seconds)
+            return self._count(result)
+        except (asyncio.TimeoutError, Exception) as e:
+            logger.warning(f"Prefetched {kind} for {thread_id} unusable: {e}")
+            return self._count(None)
+
+    def discard(self, thread_id: str):
+        """Cancel and forget everything prefetched for a thread."""
+        with self._lock:
+            self._drop(thread_id)
+
+    def _drop(self, thread_id):
+        self._touched.pop(thread_id, None)
+        for _, future in self._entries.pop(thread_id, {}).values():
+            future.cancel()
+
+    def _sweep(self, incoming: str):
+        """Evict threads idle for more than ttl_seconds, then the oldest beyond max_threads (lock held)."""
+        now = time.monotonic()
+        expired = [thread_id for thread_id, touched in self._touched.items() if now - touched > self.ttl_seconds]
+        alive = sorted((touched, thread_id) for thread_id, touched in self._touched.items()
+                       if thread_id not in expired and thread_id != incoming)
+        overflow = len(alive) + 1 - self.max_threads
+        if overflow > 0:
+            expired += [thread_id for _, thread_id in alive[:overflow]]
+        for thread_id in expired:
+            self._drop(thread_id)
+        if expired:
+            self._stats["evicted"] += len(expired)
+            logger.info(f"Evicted prefetches of {len(expired)} abandoned threads")
+
+    def _pop(self, thread_id, kind, key):
+        with self._lock:
+            entries = self._entries.get(thread_id, {})
+            entry = entries.pop(kind, None)
+            if not entries:
+                self._drop(thread_id)
+            if entry is None or entry[0] != key:
+                self._stats["misses"] += 1
+                if entry is not None:
+                    entry[1].cancel()
+                    self._stats["stale"] += 1
+                return None
+            return entry[1]
+
+    def _count(self, result):
+        with self._lock:
+            self._stats["hits" if result is not None else "misses"] += 1
+        return result
+
+    def _run(self, kind, key, fetch):
+        try:
+            return fetch()
+        except Exception as e:
+            logger.warning(f"Prefetch of {kind} {key} failed: {e}")
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(len(entries) for entries in self._entries.values())
+            return {**self._stats, "pending": pending, "threads": len(self._entries)}
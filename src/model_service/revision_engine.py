@@ -0,0 +1,175 @@
+import re
+import threading
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+# "#### 1. Logistics Snapshot", "### Itinerary", ...
+HEADING_PATTERN = re.compile(r"^\s*#{2,6}\s*(?:\d+\.\s*)?(?P<title>.+?)\s*$")
+# "**Day 3**", "### Day 3: Old Town", "Day 3 -"
+DAY_PATTERN = re.compile(r"^\s*(?:#{2,6}\s*)?(?:\*\*)?\s*day\s+(?P<number>\d+)\b", re.IGNORECASE)
+BOLD_PATTERN = re.compile(r"\*\*(.+?)\*\*")
+SECTION_MARKER = re.compile(r"^=== SECTION (?P<id>[\w-]+) ===\s*$", re.MULTILINE)
+
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "eighth": 8, "ninth": 9, "tenth": 10, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+# Concern keywords -> the block they live in
+BLOCK_KEYWORDS = {
+    "logistics": ["flight", "airline", "hotel", "accommodation", "stay", "budget", "price", "cost"],
+    "risk": ["visa", "safety", "safe", "risk", "requirement"],
+}
+# Bold labels of the plan layout ("**Dinner:**"), which are not place names
+SLOT_LABELS = {"morning", "afternoon", "evening", "night", "breakfast", "lunch", "dinner", "logistics",
+               "flight", "accommodation", "total est. budget", "visa", "safety", "note"}
+# Concerns that change the whole plan (every day depends on them)
+GLOBAL_KEYWORDS = ["whole", "entire", "everything", "all days", "every day", "start over", "from scratch", "completely"]
+
+
+class RevisionEngine:
+    """
+    Revises an itinerary section by section instead of regenerating it.
+    - split(): plan text -> addressable sections (preamble, one per "####" block, one per day);
+      joining the section texts gives back the plan exactly.
+    - targets(): which sections a concern touches (day numbers, block keywords, place names).
+    - splice(): replaces the revised sections and returns the new plan text.
+    The model call itself lives in PlanRevisionAgent; None from targets() means "regenerate all".
+    """
+    def __init__(self, max_sections: int = None):
+        self.max_sections = max_sections or settings.revision_max_sections
+        self._lock = threading.Lock()
+        self._stats = {"section_revisions": 0, "full_regenerations": 0, "sections_revised": 0}
+
+    # --- SECTIONS ---
+    def split(self, plan: str) -> list:
+        sections = []
+        current = {"id": "preamble", "title": "Preamble", "lines": []}
+        block_counts = {}
+        for line in (plan or "").splitlines(keepends=True):
+            day = DAY_PATTERN.match(line)
+            heading = None if day else HEADING_PATTERN.match(line)
+            if day:
+                section_id, title = f"day_{int(day.group('number'))}", f"Day {int(day.group('number'))}"
+            elif heading:
+                title = heading.group("title").strip("* ")
+                section_id = self._block_id(title)
+            else:
+                current["lines"].append(line)
+                continue
+            sections.append(current)
+            # Repeated ids ("Day 1" twice) stay addressable
+            block_counts[section_id] = block_counts.get(section_id, 0) + 1
+            if block_counts[section_id] > 1:
+                section_id = f"{section_id}_{block_counts[section_id]}"
+            current = {"id": section_id, "title": title, "lines": [line]}
+        sections.append(current)
+        return [
+            {"id": section["id"], "title": section["title"], "text": "".join(section["lines"])}
+            for section in sections if section["lines"]
+        ]
+
+    def join(self, sections: list) -> str:
+        return "".join(section["text"] for section in sections)
+
+    def _block_id(self, title: str) -> str:
+        lowered = title.lower()
+        for block in ["logistics", "risk", "itinerary"]:
+            if block in lowered:
+                return block
+        return re.sub(r"[^a-z0-9]+", "_", lowered).strip("_") or "section"
+
+    # --- TARGETING ---
+    def targets(self, concern: str, sections: list):
+        """Ids of the sections a concern touches, or None when a full regeneration is needed."""
+        if not concern or not sections:
+            return None
+        text = concern.lower()
+        if any(keyword in text for keyword in GLOBAL_KEYWORDS):
+            return None
+
+        ids = [section["id"] for section in sections]
+        targets = []
+        for number in self._day_numbers(text, ids):
+            targets.append(f"day_{number}")
+        for block, keywords in BLOCK_KEYWORDS.items():
+            if block in ids and any(re.search(rf"\b{keyword}", text) for keyword in keywords):
+                targets.append(block)
+        # Places named in the concern ("replace Monal") -> the sections that mention them
+        for section in sections:
+            for name in self._place_names(section):
+                if len(name) > 3 and name.lower() in text:
+                    targets.append(section["id"])
+
+        targets = [section_id for section_id in dict.fromkeys(targets) if section_id in ids]
+        day_sections = [section_id for section_id in ids if section_id.startswith("day_")]
+        if not targets or len(targets) > self.max_sections:
+            return None
+        # A hotel change moves every day's distances: regenerate the whole plan
+        if "logistics" in targets and re.search(r"\b(hotel|accommodation|stay)", text) and day_sections:
+            return None
+        return targets
+
+    def _day_numbers(self, text: str, ids: list) -> list:
+        numbers = [int(number) for number in re.findall(r"\bday\s+(\d+)", text)]
+        numbers += [ORDINALS[word] for word in re.findall(r"\bday\s+([a-z]+)", text) if word in ORDINALS]
+        numbers += [ORDINALS[word] for word in re.findall(r"\b([a-z]+)\s+day\b", text) if word in ORDINALS]
+        days = sorted(int(section_id.split("_")[1]) for section_id in ids if re.fullmatch(r"day_\d+", section_id))
+        if days and re.search(r"\b(last|final)\s+day\b", text):
+            numbers.append(days[-1])
+        return numbers
+
+    # --- SPLICING ---
+    def parse_revision(self, response: str, target_ids: list):
+        """{section_id: new text} from the model's marked response, or None if any target is missing."""
+        parts = SECTION_MARKER.split(response or "")
+        # parts = [before, id1, text1, id2, text2, ...]
+        revised = {parts[i]: parts[i + 1].strip("\n") + "\n" for i in range(1, len(parts) - 1, 2)}
+        if not all(revised.get(section_id, "").strip() for section_id in target_ids):
+            logger.warning(f"Revision response is missing sections: {[i for i in target_ids if i not in revised]}")
+            return None
+        return {section_id: revised[section_id] for section_id in target_ids}
+
+    def splice(self, sections: list, revised: dict) -> list:
+        spliced = []
+        for section in sections:
+            if section["id"] in revised:
+                text = revised[section["id"]]
+                # Keep the blank-line spacing that separated the old section from the next one
+                trailing = section["text"][len(section["text"].rstrip("\n")):]
+                section = {**section, "text": text.rstrip("\n") + (trailing or "\n")}
+            spliced.append(section)
+        return spliced
+
+    def names_outside(self, sections: list, target_ids: list) -> list:
+        """Place names used by the day sections that are not being revised (to avoid repeats)."""
+        names = []
+        for section in sections:
+            if section["id"] not in target_ids and section["id"].startswith("day_"):
+                names += self._place_names(section)
+        return list(dict.fromkeys(names))
+
+    def _place_names(self, section) -> list:
+        names = []
+        for name in BOLD_PATTERN.findall(section["text"]):
+            name = name.strip(" .:")
+            if name.lower() in SLOT_LABELS or name.lower().startswith(("day ", "title")):
+                continue
+            names.append(name)
+        return names
+
+    # --- STATS ---
+    def record(self, sections_revised: int = 0):
+        with self._lock:
+            if sections_revised:
+                self._stats["section_revisions"] += 1
+                self._stats["sections_revised"] += sections_revised
+            else:
+                self._stats["full_regenerations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
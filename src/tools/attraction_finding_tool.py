@@ -1,7 +1,10 @@
 # Libraries
+import asyncio
 from langchain.tools import tool
-from serpapi import GoogleSearch
 from src.config.settings import settings
+from src.database.response_cache import response_cache
+from src.utils.single_flight import single_flight
+from src.utils.http.transport import http_transport
 from src.logging.logging import setup_logger
 
 logger = setup_logger(__file__)
@@ -11,7 +14,11 @@ class AttractionFindingTool:
     def __init__(self):
         self.serapi = settings.serpapi_key
     def execute(self, place_name):
-        return self._extract_places(place_name)
+        # Concurrent lookups for the same city share one upstream request
+        key = single_flight.make_key("attractions", place_name)
+        return single_flight.do(key, lambda: self._extract_places(place_name))
+    async def aexecute(self, place_name):
+        return await asyncio.to_thread(self.execute, place_name)
     def _extract_places(self, place_name):
         
         try:
@@ -21,8 +28,13 @@ class AttractionFindingTool:
                 "ssrc": "A",
                 "api_key": self.serapi
                 }
-            search = GoogleSearch(params)
-            res = search.get_dict()
+            cache_key = response_cache.make_key("tripadvisor", params["ssrc"], place_name)
+            res = response_cache.get_or_fetch(
+                "tripadvisor",
+                cache_key,
+                lambda: http_transport.serpapi_search(params),
+                should_cache=lambda response: not response.get("error")
+            )
             print(f"Raw Result: {res}")
             results = self._parse_data(res, place_name)
             return results
@@ -108,4 +120,11 @@ def attraction_finding_tool(place_name: str) -> list[dict]:
             - highlighted_review (str)
     """
 
-    return attraction_service.execute(place_name)
\ No newline at end of file
+    return attraction_service.execute(place_name)
+
+
+async def _attraction_finding_tool_async(place_name: str) -> list[dict]:
+    return await attraction_service.aexecute(place_name)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+attraction_finding_tool.coroutine = _attraction_finding_tool_async
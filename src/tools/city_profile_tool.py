@@ -0,0 +1,175 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from langchain.tools import tool
+from src.config.settings import settings
+from src.tools.attraction_finding_tool import attraction_service
+from src.tools.hotel_tool import hotel_service
+from src.tools.restaurant_tool import restaurant_service
+from src.utils.helping_class.trip_records import PlaceRecord
+from src.logging.logging import setup_logger
+from src.logging.tracing import submit_in_context
+
+logger = setup_logger(__file__)
+
+
+class CityProfileTool:
+    """
+    Builds a "city profile" (attractions, hotels, restaurants) for several cities at once.
+    Every category x city lookup runs concurrently, bounded by city_profile_concurrency.
+    """
+    def __init__(self, max_concurrency: int = None):
+        self.max_concurrency = max_concurrency or settings.city_profile_concurrency
+        self.categories = {
+            "attractions": attraction_service,
+            "hotels": hotel_service,
+            "restaurants": restaurant_service,
+        }
+        # Key holding the place list in each finding tool's result
+        self.detail_keys = {
+            "attractions": "attraction_details",
+            "hotels": "hotel_details",
+            "restaurants": "restaurant_details",
+        }
+
+    def execute(self, place_names: List[str]):
+        place_names = self._clean_places(place_names)
+        jobs = [(place, category) for place in place_names for category in self.categories]
+        if not jobs:
+            return self._aggregate(place_names, {})
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(jobs))) as pool:
+            futures = {job: submit_in_context(pool, self.categories[job[1]].execute, job[0]) for job in jobs}
+            results = {job: self._safe_result(future.result, job) for job, future in futures.items()}
+        return self._aggregate(place_names, results)
+
+    async def aexecute(self, place_names: List[str]):
+        place_names = self._clean_places(place_names)
+        jobs = [(place, category) for place in place_names for category in self.categories]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(job):
+            async with semaphore:
+                try:
+                    return await self.categories[job[1]].aexecute(job[0])
+                except Exception as e:
+                    return self._error_result(job, e)
+
+        outputs = await asyncio.gather(*(run(job) for job in jobs))
+        return self._aggregate(place_names, dict(zip(jobs, outputs)))
+
+    def _clean_places(self, place_names):
+        if isinstance(place_names, str):
+            place_names = [place_names]
+        cleaned, seen = [], set()
+        for place in place_names or []:
+            place = str(place).strip()
+            if place and place.lower() not in ["none", "null"] and place.lower() not in seen:
+                seen.add(place.lower())
+                cleaned.append(place)
+        return cleaned
+
+    def _safe_result(self, get_result, job):
+        try:
+            return get_result()
+        except Exception as e:
+            return self._error_result(job, e)
+
+    def _error_result(self, job, error):
+        logger.warning(f"City profile lookup failed for {job}: {error}")
+        return {"status": "Error", "place_name": job[0], "Error": str(error)}
+
+    def _aggregate(self, place_names, results):
+        profiles = []
+        failed_lookups = 0
+        for place in place_names:
+            profile = {"place_name": place}
+            for category in self.categories:
+                result = results.get((place, category), {})
+                if result.get("status") != "Success":
+                    failed_lookups += 1
+                profile[category] = result
+            profiles.append(profile)
+
+        total_lookups = len(place_names) * len(self.categories)
+        if not total_lookups or failed_lookups == total_lookups:
+            status = "Failed"
+        elif failed_lookups:
+            status = "Partial"
+        else:
+            status = "Success"
+
+        return {
+            "status": status,
+            "profiles": profiles,
+            "result": f"{total_lookups - failed_lookups}/{total_lookups} lookups succeeded for {len(place_names)} place(s)."
+        }
+
+    def places(self, profiles: dict) -> List[PlaceRecord]:
+        """Compact records from execute()'s result (reviews are left out)."""
+        records = []
+        for profile in profiles.get("profiles", []):
+            for category in self.categories:
+                result = profile.get(category, {})
+                if result.get("status") != "Success":
+                    continue
+                for item in result.get(self.detail_keys[category], []):
+                    records.append(PlaceRecord(
+                        city=profile["place_name"],
+                        category=category,
+                        title=item.get("title"),
+                        rating=item.get("rating"),
+                        description=item.get("description"),
+                    ))
+        return records
+
+    def format_report(self, profiles: dict) -> str:
+        """
+        Deterministic Markdown rendering of execute()'s output, in the same
+        layout the DestinationInfoAgent prompt asks the model for.
+        """
+        lines, notes = [], []
+        for profile in profiles.get("profiles", []):
+            place = profile["place_name"]
+            for category in self.categories:
+                result = profile.get(category, {})
+                details = result.get(self.detail_keys[category], [])
+                if result.get("status") != "Success" or not details:
+                    notes.append(f"No {category} found for {place}")
+                    continue
+                lines.append(f"**{category.title()} in {place}:**")
+                for idx, item in enumerate(details, start=1):
+                    lines.append(f"{idx}. {item.get('title')} ({item.get('rating')}) - {item.get('description')}")
+                    lines.append(f"\"{item.get('highlighted_review')}\"")
+                lines.append("")
+        if notes:
+            lines.append(f"**Note:** {'; '.join(notes)}")
+        return "\n".join(lines).strip()
+
+# Initialize Service
+city_profile_service = CityProfileTool()
+
+@tool
+def city_profile_tool(place_names: List[str]) -> dict:
+    """
+    Find attractions, hotels and restaurants for one or more cities in a single call.
+    Prefer this over the individual tools when several cities (or all three categories) are needed.
+
+    Args:
+        place_names (List[str]): Names of the cities.
+
+    Returns:
+        Dict: Contains keys: status, profiles (list), result.
+
+        Each profile contains: place_name, attractions, hotels, restaurants
+        (the same dicts returned by the individual finding tools).
+    """
+    return city_profile_service.execute(place_names)
+
+
+async def _city_profile_tool_async(place_names: List[str]) -> dict:
+    return await city_profile_service.aexecute(place_names)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+city_profile_tool.coroutine = _city_profile_tool_async
@@ -1,29 +1,237 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import List
+
 import googlemaps
+import numpy as np
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 from src.config.settings import settings
-from src.utils.helping_class.distance_input import DistanceInput
+from src.database.response_cache import response_cache
+from src.utils.http.transport import http_transport
+from src.utils.helping_class.distance_input import DistanceInput, DistanceBatchInput
 from src.logging.logging import setup_logger
 
 logger = setup_logger(__file__)
 
+EARTH_RADIUS_KM = 6371.0088
+
+# Average door-to-door speed and road/path detour over the great-circle distance, per mode
+SPEED_PROFILES_KMH = {"walking": 4.8, "bicycling": 15.0, "transit": 25.0, "driving": 40.0}
+DETOUR_FACTORS = {"walking": 1.3, "bicycling": 1.3, "transit": 1.5, "driving": 1.4}
+
+# Element statuses that are a real answer; anything else is worth estimating locally
+DEFINITIVE_STATUSES = ["OK", "ZERO_RESULTS", "NOT_FOUND"]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; works element-wise on NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class GeocodeIndex:
+    """
+    Place name -> (lat, lng), kept in an in-memory LRU and in the response cache, so repeated
+    places are resolved without a network call (and still resolve when the API is down).
+    """
+    def __init__(self, client_provider, max_entries: int = None):
+        self.client_provider = client_provider  # returns the googlemaps.Client
+        self.max_entries = max_entries or settings.geocode_memory_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # {normalized place: (lat, lng)}
+
+    def lookup(self, place: str):
+        key = response_cache.make_key("geocode", place)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            coordinates = response_cache.get_or_fetch(
+                "geocode",
+                key,
+                lambda: self._geocode(place),
+                ttl_hours=settings.geocode_cache_ttl_hours,
+                should_cache=lambda value: value is not None
+            )
+        except Exception as e:
+            logger.warning(f"Geocoding failed for {place}: {e}")
+            return None
+        if coordinates:
+            with self._lock:
+                self._memory[key] = tuple(coordinates)
+                self._memory.move_to_end(key)
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+            return tuple(coordinates)
+        return None
+
+    def _geocode(self, place: str):
+        results = self.client_provider().geocode(place)
+        if not results:
+            return None
+        location = results[0]["geometry"]["location"]
+        return [location["lat"], location["lng"]]
+
+
 # 2. Define the Class Service
 class DistanceMatrixTool:
+    # Distance Matrix API limits per request
+    MAX_ORIGINS = 25
+    MAX_DESTINATIONS = 25
+    MAX_ELEMENTS = 100
+
     def __init__(self):
-        # Initialize the Google Maps client
+        self._lock = threading.Lock()
+        self._gmaps = None
+        self.geocoder = GeocodeIndex(lambda: self.gmaps)
+
+    @property
+    def gmaps(self):
+        # Initialize the Google Maps client on the shared pooled session (on first use)
         # Ensure 'GOOGLE_MAPS_API_KEY' is in your settings
-        self.gmaps = googlemaps.Client(key=settings.google_places_key)
+        if self._gmaps is None:
+            with self._lock:
+                if self._gmaps is None:
+                    self._gmaps = googlemaps.Client(
+                        key=settings.google_places_key,
+                        connect_timeout=http_transport.connect_timeout,
+                        read_timeout=http_transport.read_timeout,
+                        requests_session=http_transport.session,
+                    )
+        return self._gmaps
 
-    def execute(self, origins: str, destinations: str, mode: str):
+    def execute(self, origins: str, destinations: str, mode: str, approximate: bool = False):
+        if approximate:
+            return self._estimate_pairs([(origins, destinations)], mode)[(origins, destinations)]
         return self._calculate_distance(origins, destinations, mode)
 
+    async def aexecute(self, origins: str, destinations: str, mode: str, approximate: bool = False):
+        return await asyncio.to_thread(self.execute, origins, destinations, mode, approximate)
+
+    def execute_batch(self, origins: List[str], destinations: List[str], mode: str, approximate: bool = False):
+        """
+        Every origin x destination pair in as few API calls as the limits allow.
+        Pairs the API cannot answer (errors, rate limits) are estimated locally.
+        """
+        origins, destinations = self._clean(origins), self._clean(destinations)
+        pairs = [(origin, destination) for origin in origins for destination in destinations]
+        api_calls = 0
+        if approximate:
+            parsed_pairs = self._estimate_pairs(pairs, mode)
+        else:
+            try:
+                elements, api_calls = self._fetch_pairs(origins, destinations, mode)
+            except Exception as e:
+                if not settings.distance_fallback_enabled:
+                    return {
+                        "status": "Error",
+                        "mode": mode,
+                        "matrix": [],
+                        "result": f"Error calculating distances: {str(e)}"
+                    }
+                logger.warning(f"Distance Matrix unavailable, estimating {len(pairs)} pairs locally: {e}")
+                elements = {}
+            parsed_pairs = {pair: self._parse_element(elements.get(pair), *pair, mode) for pair in pairs}
+            degraded = [pair for pair in pairs if self._needs_estimate(elements.get(pair))]
+            if degraded and settings.distance_fallback_enabled:
+                parsed_pairs.update(self._estimate_pairs(degraded, mode))
+
+        matrix = []
+        for origin, destination in pairs:
+            parsed = parsed_pairs[(origin, destination)]
+            matrix.append({
+                "origin": origin,
+                "destination": destination,
+                "status": parsed["status"],
+                **(parsed["distance_data"] or {"result": parsed["result"]}),
+            })
+
+        measured = sum(1 for pair in matrix if pair["status"] == "Success")
+        if not matrix or not measured:
+            status = "Failed"
+        elif measured < len(matrix):
+            status = "Partial"
+        else:
+            status = "Success"
+        return {
+            "status": status,
+            "mode": mode,
+            "matrix": matrix,
+            "result": f"{measured}/{len(matrix)} pairs measured ({api_calls} API call(s))."
+        }
+
+    async def aexecute_batch(self, origins: List[str], destinations: List[str], mode: str, approximate: bool = False):
+        return await asyncio.to_thread(self.execute_batch, origins, destinations, mode, approximate)
+
+    def _clean(self, places):
+        if isinstance(places, str):
+            places = [places]
+        cleaned = []
+        for place in places or []:
+            place = str(place).strip()
+            if place and place not in cleaned:
+                cleaned.append(place)
+        return cleaned
+
+    def _pair_key(self, origin, destination, mode):
+        return response_cache.make_key("distance", mode, origin, destination)
+
+    def _fetch_pairs(self, origins, destinations, mode):
+        """
+        Return ({(origin, destination): element}, api_calls).
+        Cached pairs are served from the response cache; the rest are fetched in
+        chunks that respect the per-request origin/destination/element limits.
+        """
+        elements, missing = {}, []
+        for origin in origins:
+            for destination in destinations:
+                cached = response_cache.get("distance", self._pair_key(origin, destination, mode), ttl_hours=settings.distance_cache_ttl_hours)
+                if cached is not None:
+                    elements[(origin, destination)] = cached
+                else:
+                    missing.append((origin, destination))
+        if not missing:
+            return elements, 0
+
+        missing_origins = [o for o in origins if any(pair[0] == o for pair in missing)]
+        missing_destinations = [d for d in destinations if any(pair[1] == d for pair in missing)]
+        api_calls = 0
+        for origin_chunk, destination_chunk in self._chunks(missing_origins, missing_destinations):
+            result = self.gmaps.distance_matrix(origin_chunk, destination_chunk, mode=mode)
+            api_calls += 1
+            for row_origin, row in zip(origin_chunk, result.get("rows", [])):
+                for column_destination, element in zip(destination_chunk, row.get("elements", [])):
+                    elements[(row_origin, column_destination)] = element
+                    # Definitive answers only; transient statuses are retried next time
+                    if element.get("status") in ["OK", "ZERO_RESULTS"]:
+                        response_cache.set("distance", self._pair_key(row_origin, column_destination, mode), element)
+        return elements, api_calls
+
+    def _chunks(self, origins, destinations):
+        destination_size = min(self.MAX_DESTINATIONS, self.MAX_ELEMENTS, len(destinations))
+        for d_start in range(0, len(destinations), destination_size):
+            destination_chunk = destinations[d_start:d_start + destination_size]
+            origin_size = min(self.MAX_ORIGINS, self.MAX_ELEMENTS // len(destination_chunk))
+            for o_start in range(0, len(origins), origin_size):
+                yield origins[o_start:o_start + origin_size], destination_chunk
+
     def _calculate_distance(self, origins, destinations, mode):
         try:
-            # Call the Google Maps API
-            result = self.gmaps.distance_matrix(origins, destinations, mode=mode)
-            return self._parse_data(result, origins, destinations)
-            
+            # Call the Google Maps API (or the pair cache)
+            elements, _ = self._fetch_pairs([origins], [destinations], mode)
+            element = elements.get((origins, destinations))
+            if self._needs_estimate(element) and settings.distance_fallback_enabled:
+                return self._estimate_pairs([(origins, destinations)], mode)[(origins, destinations)]
+            return self._parse_element(element, origins, destinations, mode)
+
         except Exception as e:
+            if settings.distance_fallback_enabled:
+                logger.warning(f"Distance Matrix unavailable, estimating locally: {e}")
+                return self._estimate_pairs([(origins, destinations)], mode)[(origins, destinations)]
             return {
                 "status": "Error",
                 "origin": origins,
@@ -32,19 +240,56 @@ class DistanceMatrixTool:
                 "result": f"Error calculating distance: {str(e)}"
             }
 
-    def _parse_data(self, result, origins, destinations):
-        # 1. Check for valid structure
-        if not result.get('rows'):
-            return self._format_failure(origins, destinations, "No data returned from API.")
+    # --- LOCAL ESTIMATES ---
+    def _needs_estimate(self, element) -> bool:
+        return not element or element.get("status") not in DEFINITIVE_STATUSES
 
-        rows = result['rows'][0]
-        elements = rows.get('elements', [])
-        
-        if not elements:
+    def _estimate_pairs(self, pairs, mode):
+        """
+        Approximate distance/duration for (origin, destination) pairs: geocode each
+        place once, then one vectorized haversine pass scaled by the mode's profile.
+        """
+        places = {place for pair in pairs for place in pair}
+        coordinates = {place: self.geocoder.lookup(place) for place in places}
+        known = [pair for pair in pairs if coordinates[pair[0]] and coordinates[pair[1]]]
+
+        estimates = {
+            pair: self._format_failure(*pair, "Location could not be geocoded for an estimate.")
+            for pair in pairs if pair not in known
+        }
+        if known:
+            starts = np.array([coordinates[origin] for origin, _ in known])
+            ends = np.array([coordinates[destination] for _, destination in known])
+            profile = mode if mode in SPEED_PROFILES_KMH else "walking"
+            distances = haversine_km(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]) * DETOUR_FACTORS[profile]
+            minutes = distances / SPEED_PROFILES_KMH[profile] * 60
+            for pair, distance_km, duration_min in zip(known, distances, minutes):
+                estimates[pair] = self._format_estimate(*pair, float(distance_km), float(duration_min), mode)
+        return estimates
+
+    def _format_estimate(self, origins, destinations, distance_km, duration_min, mode):
+        distance_text = f"{distance_km:.1f} km"
+        hours, minutes = divmod(max(1, round(duration_min)), 60)
+        duration_text = f"{hours} hours {minutes} mins" if hours else f"{minutes} mins"
+        return {
+            "status": "Success",
+            "origin": origins,
+            "destination": destinations,
+            "distance_data": {
+                "distance": distance_text,
+                "duration": duration_text,
+                "mode": mode,
+                "approximate": True
+            },
+            "result": f"The approximate duration between {origins} and {destinations} is {duration_text} and distance is {distance_text}."
+        }
+
+    def _parse_element(self, element, origins, destinations, mode):
+        # 1. Check for valid structure
+        if not element:
              return self._format_failure(origins, destinations, "No route elements found.")
 
         # 2. Check specific element status
-        element = elements[0]
         status = element.get('status')
 
         if status == "ZERO_RESULTS":
@@ -69,7 +314,7 @@ class DistanceMatrixTool:
             "distance_data": {
                 "distance": distance_text,
                 "duration": duration_text,
-                "mode": result.get("mode", "unknown") # sometimes api doesn't return mode explicitly in body
+                "mode": mode
             },
             "result": f"The duration between {origins} and {destinations} is {duration_text} and distance is {distance_text}."
         }
@@ -88,11 +333,43 @@ distance_service = DistanceMatrixTool()
 
 # 3. Define the LangChain Tool
 @tool("distance_matrix", args_schema=DistanceInput)
-def distance_measurement_tool(origins: str, destinations: str, mode: str = "walking") -> dict:
-    """ 
+def distance_measurement_tool(origins: str, destinations: str, mode: str = "walking", approximate: bool = False) -> dict:
+    """
     Measure the distance and travel time between two locations.
+    Set approximate=True when a rough estimate is enough (no API call for known places).
     
     Returns:
         Dict: Contains keys: status, origin, destination, distance_data (dict), result.
     """
-    return distance_service.execute(origins, destinations, mode)
\ No newline at end of file
+    return distance_service.execute(origins, destinations, mode, approximate)
+
+
+async def _distance_measurement_tool_async(origins: str, destinations: str, mode: str = "walking", approximate: bool = False) -> dict:
+    return await distance_service.aexecute(origins, destinations, mode, approximate)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+distance_measurement_tool.coroutine = _distance_measurement_tool_async
+
+
+@tool("distance_matrix_batch", args_schema=DistanceBatchInput)
+def distance_matrix_batch_tool(origins: List[str], destinations: List[str], mode: str = "walking", approximate: bool = False) -> dict:
+    """
+    Measure distance and travel time for EVERY origin x destination pair in one call
+    (e.g. all hotels -> all attractions and restaurants of the trip).
+    Prefer this over calling distance_matrix once per pair.
+    Set approximate=True when rough estimates are enough.
+
+    Returns:
+        Dict: Contains keys: status, mode, matrix (list), result.
+
+        Each matrix entry contains: origin, destination, status, and distance/duration
+        (or result with the failure reason).
+    """
+    return distance_service.execute_batch(origins, destinations, mode, approximate)
+
+
+async def _distance_matrix_batch_tool_async(origins: List[str], destinations: List[str], mode: str = "walking", approximate: bool = False) -> dict:
+    return await distance_service.aexecute_batch(origins, destinations, mode, approximate)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+distance_matrix_batch_tool.coroutine = _distance_matrix_batch_tool_async
@@ -1,16 +1,22 @@
 # Libraries
 from ast import Dict
-import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 from langchain.tools import tool
-from serpapi import GoogleSearch
 from src.config.settings import settings
-from src.utils.validators import flight_code_check, date_check
+from src.utils.validators import airport_code_check, date_check
+from src.utils.airport_index import airport_index
+from src.utils.single_flight import single_flight
+from src.utils.http.transport import http_transport
+from src.utils.helping_class.trip_records import FlightOption
 from src.logging.logging import setup_logger
+from src.logging.tracing import submit_in_context
 
 logger = setup_logger(__file__)
-os.environ["http_proxy"] = settings.http_proxy
-os.environ["https_proxy"] = settings.https_proxy
 
 
 
@@ -21,14 +27,37 @@ class FlightSearchTool:
         """ 
         This function is reponsible for final execution of code
         """
-        if not flight_code_check(departure_id):
-            raise ValueError(f"The departure id: {departure_id} is wrong")
-        if not flight_code_check(arrival_id):
-            raise ValueError(f"The departure id: {arrival_id} is wrong")
+        departure_id = self.resolve_airport(departure_id)
+        arrival_id = self.resolve_airport(arrival_id)
+        if not airport_code_check(departure_id, strict=settings.strict_airport_validation):
+            raise ValueError(f"The departure id: {departure_id} is wrong. {self._suggestions(departure_id)}")
+        if not airport_code_check(arrival_id, strict=settings.strict_airport_validation):
+            raise ValueError(f"The arrival id: {arrival_id} is wrong. {self._suggestions(arrival_id)}")
         if not date_check(travel_date):
             raise ValueError(f"The Date Information is incorrect: {travel_date}")
 
-        return self._flight_info_extract(departure_id, arrival_id, travel_date) 
+        # Concurrent searches for the same route and date share one upstream request
+        key = single_flight.make_key("flights", departure_id, arrival_id, travel_date)
+        return single_flight.do(key, lambda: self._flight_info_extract(departure_id, arrival_id, travel_date))
+
+    async def aexecute(self, departure_id: str, arrival_id: str, travel_date: str):
+        return await asyncio.to_thread(self.execute, departure_id, arrival_id, travel_date)
+
+    def resolve_airport(self, place: str) -> str:
+        """
+        Resolve a city, alias, country or IATA/metro code to SerpAPI-ready airport code(s)
+        using the local airport index. Unresolvable input is returned upper-cased.
+        """
+        resolution = airport_index.resolve(place)
+        if resolution:
+            return resolution["code"]
+        return str(place).strip().upper()
+
+    def _suggestions(self, place: str) -> str:
+        matches = airport_index.suggest(place)
+        if not matches:
+            return "Use a valid IATA airport code or city name."
+        return f"Did you mean one of: {', '.join(matches)}?"
 
     def _flight_info_extract(self, departure_id, arrival_id, travel_date):
         try:
@@ -41,8 +70,8 @@ class FlightSearchTool:
                         "outbound_date": travel_date,
                         "api_key": self.serpapi
                     }
-            search = GoogleSearch(params)
-            results = self._parse_flight_details(search.get_dict(),departure_id, arrival_id, travel_date)
+            response = http_transport.serpapi_search(params)
+            results = self._parse_flight_details(response, departure_id, arrival_id, travel_date)
             return results
         except Exception as e:
             return {
@@ -114,7 +143,142 @@ class FlightSearchTool:
         result = f"There are Flights from: {departure_id} to {arrival_id} on date: {travel_date}" 
         return all_options, result 
 
+class RateLimiter:
+    """Spaces out request starts so at most `rate` requests begin per second."""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class FlightRoutePlanner:
+    """
+    Fan-out engine for multi-city trips.
+    Computes every required leg (departure -> each destination, plus every
+    destination -> destination permutation), dedupes them by resolved place
+    ("Beijing" and "PEK" are one stop) and fetches all of them concurrently
+    through a rate-limited pool.
+    """
+    def __init__(self, flight_search: FlightSearchTool, max_concurrency: int = None, requests_per_second: float = None):
+        self.flight_search = flight_search
+        self.max_concurrency = max_concurrency or settings.flight_route_concurrency
+        self.rate_limiter = RateLimiter(requests_per_second or settings.flight_requests_per_second)
+
+    def plan_legs(self, departure_id: str, arrival_ids: List[str]):
+        if isinstance(arrival_ids, str):
+            arrival_ids = [arrival_ids]
+        departure_id, departure_key = self._stop(departure_id)
+        destinations = {}  # {place key: airport code(s)}, first spelling wins
+        for place in arrival_ids:
+            if place and place.strip():
+                code, key = self._stop(place)
+                if key != departure_key:
+                    destinations.setdefault(key, code)
+
+        legs = [(departure_id, code) for code in destinations.values()]
+        legs += [(destinations[origin], destinations[target]) for origin in destinations for target in destinations if origin != target]
+
+        unique_legs = []
+        for leg in legs:
+            if leg[0] != leg[1] and leg not in unique_legs:
+                unique_legs.append(leg)
+        return unique_legs
+
+    def _stop(self, place: str):
+        """(SerpAPI code(s), place key): the key is the resolved city, so names and codes of one place match."""
+        resolution = airport_index.resolve(place)
+        if resolution:
+            return resolution["code"], (resolution["city"], resolution["country"])
+        code = place.strip().upper()
+        return code, code
+
+    def execute(self, departure_id: str, arrival_ids: List[str], travel_date: str):
+        legs = self.plan_legs(departure_id, arrival_ids)
+        if not legs:
+            return self._combine(departure_id, travel_date, [])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(legs))) as pool:
+            futures = [submit_in_context(pool, self._search_leg, leg, travel_date) for leg in legs]
+            results = [future.result() for future in futures]
+        return self._combine(departure_id, travel_date, results)
+
+    async def aexecute(self, departure_id: str, arrival_ids: List[str], travel_date: str):
+        return await asyncio.to_thread(self.execute, departure_id, arrival_ids, travel_date)
+
+    def _search_leg(self, leg, travel_date):
+        self.rate_limiter.wait()
+        try:
+            return self.flight_search.execute(leg[0], leg[1], travel_date)
+        except Exception as e:
+            return {
+                "status": "Error",
+                "departure_id": leg[0],
+                "arrival_id": leg[1],
+                "travel_date": travel_date,
+                "error_message": str(e)
+            }
+
+    def _combine(self, departure_id, travel_date, results):
+        successful = [leg for leg in results if leg.get("status") == "Success"]
+        if not results or not successful:
+            status = "Failed"
+        elif len(successful) < len(results):
+            status = "Partial"
+        else:
+            status = "Success"
+        return {
+            "status": status,
+            "departure_id": departure_id,
+            "travel_date": travel_date,
+            "total_legs": len(results),
+            "successful_legs": len(successful),
+            "legs": results,
+            "result": f"Found flight options for {len(successful)} of {len(results)} route legs."
+        }
+
+    def options(self, result: dict, per_leg: int = None) -> List[FlightOption]:
+        """Compact records from execute()'s result: the cheapest priced options of every successful leg."""
+        per_leg = per_leg or settings.flight_options_per_leg
+        records = []
+        for leg in result.get("legs", []):
+            if leg.get("status") != "Success":
+                continue
+            candidates = leg.get("best_flight_result", {}).get("best_flight_result", []) + \
+                leg.get("other_flight_result", {}).get("other_flight_result", [])
+            for option in sorted(candidates, key=lambda option: option["price"])[:per_leg]:
+                records.append(FlightOption(
+                    leg=f"{leg['departure_id']} -> {leg['arrival_id']}",
+                    date=leg["travel_date"],
+                    price=option["price"],
+                    hours=option["Total Flight Duration (hours)"],
+                    layovers=[name for name in option["Layover"] if name != "No Layover"],
+                    price_level=leg.get("current_price_status"),
+                ))
+        return records
+
+    def format_report(self, result: dict, records: List[FlightOption] = None) -> str:
+        """Deterministic text version of options(), used when the summary model call is skipped."""
+        records = self.options(result) if records is None else records
+        lines = [result.get("result", "")]
+        for record in records:
+            layovers = ", ".join(record["layovers"]) or "direct"
+            lines.append(f"- {record['leg']} on {record['date']}: {record['price']} ({record['hours']} h, {layovers}, price level {record['price_level']})")
+        failed = [f"{leg['departure_id']} -> {leg['arrival_id']}" for leg in result.get("legs", []) if leg.get("status") != "Success"]
+        if failed:
+            lines.append(f"No flights found for: {', '.join(failed)}")
+        return "\n".join(lines)
+
+
 flight_tool = FlightSearchTool()
+route_planner = FlightRoutePlanner(flight_tool)
 
 @tool
 def One_way_flight_search(departure_id: str, arrival_id: str, travel_date: str):
@@ -123,8 +287,8 @@ def One_way_flight_search(departure_id: str, arrival_id: str, travel_date: str):
     Returns flight options with price, layovers, and duration details.
     
     Args:
-        departure_id (str): Departure airport code (e.g., 'PEK' for Beijing)
-        arrival_id (str): Arrival airport code (e.g., 'ISB' for Islamabad)
+        departure_id (str): Departure airport code (e.g., 'PEK' for Beijing) or city name
+        arrival_id (str): Arrival airport code (e.g., 'ISB' for Islamabad) or city name
         travel_date (str): Travel date in YYYY-MM-DD format (e.g., '2026-03-03')
     
     Returns:
@@ -132,3 +296,35 @@ def One_way_flight_search(departure_id: str, arrival_id: str, travel_date: str):
     
     """
     return flight_tool.execute(departure_id, arrival_id, travel_date)
+
+
+async def _one_way_flight_search_async(departure_id: str, arrival_id: str, travel_date: str):
+    return await flight_tool.aexecute(departure_id, arrival_id, travel_date)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+One_way_flight_search.coroutine = _one_way_flight_search_async
+
+
+@tool
+def multi_city_flight_search(departure_id: str, arrival_ids: List[str], travel_date: str):
+    """
+    Search one-way flights for every leg of a multi-city trip in a single call:
+    departure -> each destination, plus every destination -> destination combination.
+
+    Args:
+        departure_id (str): Departure airport code (e.g., 'TYN' for Taiyuan) or city name
+        arrival_ids (List[str]): Destination airport codes (e.g., ['ISB', 'KHI']) or city names
+        travel_date (str): Travel date in YYYY-MM-DD format (e.g., '2026-03-03')
+
+    Returns:
+        Dict: Contains keys: status, departure_id, travel_date, total_legs, successful_legs,
+        legs (list of One_way_flight_search results), result.
+    """
+    return route_planner.execute(departure_id, arrival_ids, travel_date)
+
+
+async def _multi_city_flight_search_async(departure_id: str, arrival_ids: List[str], travel_date: str):
+    return await route_planner.aexecute(departure_id, arrival_ids, travel_date)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+multi_city_flight_search.coroutine = _multi_city_flight_search_async
@@ -1,6 +1,9 @@
+import asyncio
 from langchain.tools import tool
-from serpapi import GoogleSearch
 from src.config.settings import settings
+from src.database.response_cache import response_cache
+from src.utils.single_flight import single_flight
+from src.utils.http.transport import http_transport
 from src.logging.logging import setup_logger
 
 logger = setup_logger(__file__)
@@ -10,7 +13,12 @@ class HotelFindingTool:
         self.serapi = settings.serpapi_key
 
     def execute(self, place_name):
-        return self._extract_places(place_name)
+        # Concurrent lookups for the same city share one upstream request
+        key = single_flight.make_key("hotels", place_name)
+        return single_flight.do(key, lambda: self._extract_places(place_name))
+
+    async def aexecute(self, place_name):
+        return await asyncio.to_thread(self.execute, place_name)
 
     def _extract_places(self, place_name):
         try:
@@ -20,8 +28,13 @@ class HotelFindingTool:
                 "ssrc": "h",  # 'h' specifically targeting Hotels
                 "api_key": self.serapi
             }
-            search = GoogleSearch(params)
-            res = search.get_dict()
+            cache_key = response_cache.make_key("tripadvisor", params["ssrc"], place_name)
+            res = response_cache.get_or_fetch(
+                "tripadvisor",
+                cache_key,
+                lambda: http_transport.serpapi_search(params),
+                should_cache=lambda response: not response.get("error")
+            )
             print(f"The raw result is: {res}") 
             results = self._parse_data(res, place_name)
             return results
@@ -103,4 +116,11 @@ def hotel_finding_tool(place_name: str) -> dict:
             - rating
             - highlighted_review
     """
-    return hotel_service.execute(place_name)
\ No newline at end of file
+    return hotel_service.execute(place_name)
+
+
+async def _hotel_finding_tool_async(place_name: str) -> dict:
+    return await hotel_service.aexecute(place_name)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+hotel_finding_tool.coroutine = _hotel_finding_tool_async
@@ -1,6 +1,9 @@
+import asyncio
 from langchain.tools import tool
-from serpapi import GoogleSearch
 from src.config.settings import settings
+from src.database.response_cache import response_cache
+from src.utils.single_flight import single_flight
+from src.utils.http.transport import http_transport
 from src.logging.logging import setup_logger
 
 logger = setup_logger(__file__)
@@ -9,7 +12,12 @@ class RestaurantFindingTool:
         self.serapi = settings.serpapi_key
 
     def execute(self, place_name):
-        return self._extract_places(place_name)
+        # Concurrent lookups for the same city share one upstream request
+        key = single_flight.make_key("restaurants", place_name)
+        return single_flight.do(key, lambda: self._extract_places(place_name))
+
+    async def aexecute(self, place_name):
+        return await asyncio.to_thread(self.execute, place_name)
 
     def _extract_places(self, place_name):
         try:
@@ -19,8 +27,14 @@ class RestaurantFindingTool:
                 "ssrc": "r",  # 'r' specifically targeting Restaurants
                 "api_key": self.serapi
             }
-            search = GoogleSearch(params)
-            results = self._parse_data(search.get_dict(), place_name)
+            cache_key = response_cache.make_key("tripadvisor", params["ssrc"], place_name)
+            res = response_cache.get_or_fetch(
+                "tripadvisor",
+                cache_key,
+                lambda: http_transport.serpapi_search(params),
+                should_cache=lambda response: not response.get("error")
+            )
+            results = self._parse_data(res, place_name)
             return results
         except Exception as e:
             return {
@@ -100,4 +114,11 @@ def restaurant_finding_tool(place_name: str) -> dict:
             - rating
             - highlighted_review
     """
-    return restaurant_service.execute(place_name)
\ No newline at end of file
+    return restaurant_service.execute(place_name)
+
+
+async def _restaurant_finding_tool_async(place_name: str) -> dict:
+    return await restaurant_service.aexecute(place_name)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+restaurant_finding_tool.coroutine = _restaurant_finding_tool_async
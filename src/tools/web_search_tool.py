@@ -1,12 +1,34 @@
+import asyncio
 import os
+import re
+import threading
 from typing import Literal, List, Dict, Union, Any
+from urllib.parse import urlparse
 from langchain.tools import tool
 from tavily import TavilyClient
 from src.config.settings import settings
+from src.database.response_cache import response_cache
+from src.utils.http.transport import http_transport
 from src.logging.logging import setup_logger
 
 logger = setup_logger(__file__)
 
+# Words that do not change what a travel query is about
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "in", "on", "at", "to", "from", "with",
+    "about", "is", "are", "what", "which", "how", "best", "top", "guide", "me", "my", "i",
+}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query for cache keys:
+    "Tokyo 3-day itinerary" and "3 day itinerary for Tokyo" -> "3 day itinerary tokyo".
+    """
+    tokens = re.findall(r"[a-z0-9]+", str(query).lower())
+    kept = sorted({token for token in tokens if token not in STOPWORDS})
+    return " ".join(kept) or " ".join(tokens)
+
 
 class WebSearchService:
     def __init__(self):
@@ -15,35 +37,108 @@ class WebSearchService:
         if not self.api_key:
              # Fallback or error handling if key is missing
              raise ValueError("TAVILY_API_KEY is not set in environment variables.")
-        self.client = TavilyClient(api_key=self.api_key)
+        self._lock = threading.Lock()
+        self._client = None
+        self._paths = {"basic": 0, "escalated": 0}
+
+    @property
+    def client(self):
+        # Created on first use; TavilyClient writes its API key into the session headers,
+        # so it gets its own session (same keep-alive pool), never the shared one
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = TavilyClient(api_key=self.api_key, session=http_transport.client_session())
+        return self._client
 
     def execute(self, query: str, country: str, max_results: int, search_depth: str, topic: str):
+        if search_depth == "adaptive":
+            return self._adaptive_search(query, country, max_results, topic)
         return self._perform_search(query, country, max_results, search_depth, topic)
 
+    async def aexecute(self, query: str, country: str, max_results: int, search_depth: str, topic: str):
+        return await asyncio.to_thread(self.execute, query, country, max_results, search_depth, topic)
+
     def _perform_search(self, query, country, max_results, search_depth, topic):
         try:
-            # Preserving exact logic from original function
-            if topic == "general":
-                response = self.client.search(
-                    query = query,
-                    search_depth = search_depth,
-                    topic = topic,
-                    country =  country,
-                    max_results=max_results
-                )
-            else:
-                # Original logic did not pass 'country' for non-general topics
-                response = self.client.search(
-                    query=query,
-                    search_depth=search_depth,
-                    topic=topic,
-                    max_results=max_results
-                )
-            return response.get("results", [])
-
+            return response_cache.get_or_fetch(
+                "web_search",
+                self._cache_key(query, country, max_results, search_depth, topic),
+                lambda: self._search(query, country, max_results, search_depth, topic),
+                ttl_hours=self._ttl_hours(topic)
+            )
         except Exception as e:
             return f"Error performing search: {str(e)}"
 
+    def _adaptive_search(self, query, country, max_results, topic):
+        """
+        Run the fast "basic" search first and only pay for "advanced" when the
+        basic results score below settings.web_search_escalation_threshold.
+        """
+        results = self._perform_search(query, country, max_results, "basic", topic)
+        score = self._score_results(results, max_results)
+        path = "basic"
+        if score < settings.web_search_escalation_threshold:
+            advanced = self._perform_search(query, country, max_results, "advanced", topic)
+            if isinstance(advanced, list):
+                results, score, path = advanced, self._score_results(advanced, max_results), "basic->advanced"
+
+        with self._lock:
+            self._paths["basic" if path == "basic" else "escalated"] += 1
+        logger.info(f"Adaptive web search '{query}': {path} (score {score:.2f})")
+        if isinstance(results, str):
+            return results
+        return {"search_path": path, "quality_score": round(score, 2), "results": results}
+
+    def _score_results(self, results, max_results) -> float:
+        """0..1 quality estimate from result count, content length and domain diversity."""
+        if not isinstance(results, list) or not results:
+            return 0.0
+        count_score = min(len(results) / max(1, max_results), 1.0)
+        average_length = sum(len(result.get("content") or "") for result in results) / len(results)
+        length_score = min(average_length / settings.web_search_min_content_chars, 1.0)
+        domains = {urlparse(result.get("url") or "").netloc for result in results}
+        diversity_score = len(domains) / len(results)
+        return 0.4 * count_score + 0.35 * length_score + 0.25 * diversity_score
+
+    def _cache_key(self, query, country, max_results, search_depth, topic):
+        # Country only reaches Tavily for general searches
+        country = country if topic == "general" else ""
+        return response_cache.make_key("web_search", normalize_query(query), country, topic, search_depth, max_results)
+
+    def _ttl_hours(self, topic):
+        if topic == "news":
+            return settings.web_search_news_ttl_hours
+        return settings.web_search_general_ttl_hours
+
+    def stats(self) -> dict:
+        """Hit/miss counters of the web search cache, plus which adaptive path was taken."""
+        cache = response_cache.stats()["namespaces"].get("web_search", {"hits": 0, "misses": 0, "hit_rate": 0.0})
+        with self._lock:
+            return {**cache, "adaptive_paths": dict(self._paths)}
+
+    def _search(self, query, country, max_results, search_depth, topic):
+        # Preserving exact logic from original function
+        if topic == "general":
+            response = self.client.search(
+                query = query,
+                search_depth = search_depth,
+                topic = topic,
+                country =  country,
+                max_results=max_results,
+                timeout=http_transport.read_timeout
+            )
+        else:
+            # Original logic did not pass 'country' for non-general topics
+            response = self.client.search(
+                query=query,
+                search_depth=search_depth,
+                topic=topic,
+                max_results=max_results,
+                timeout=http_transport.read_timeout
+            )
+        return response.get("results", [])
+
 # Initialize the Service
 web_search_service = WebSearchService()
 
@@ -52,9 +147,9 @@ def web_search_tool(
     query: str, 
     country: str = "china", 
     max_results: int = 5,
-    search_depth: Literal["basic", "advanced"] = "advanced",
+    search_depth: Literal["adaptive", "basic", "advanced"] = "adaptive",
     topic: Literal["general", "news"] = "general"
-) -> Union[List[Dict[str, Any]], str]:
+) -> Union[List[Dict[str, Any]], Dict[str, Any], str]:
     """
     Perform an advanced web search using the Tavily API to find real-time information, 
     news, or travel itineraries.
@@ -68,10 +163,25 @@ def web_search_tool(
         query (str): The search query. Be specific (e.g., "3 day itinerary for Tokyo" instead of "Tokyo").
         country (str): should be country name: for example china, united states etc
         max_results (int): The maximum number of search results to return. Defaults to 5.
-        search_depth (str): "basic" for fast results, "advanced" for high-quality content. Defaults to "advanced".
+        search_depth (str): "adaptive" tries "basic" first and escalates to "advanced" only when the results are thin,
+            "basic" for fast results, "advanced" for high-quality content. Defaults to "adaptive".
         topic (str): "general" for most queries, "news" for recent events. Defaults to "general".
 
     Returns:
         list[dict]: A list of dictionaries containing 'url', 'content', and 'title' for each result.
+        With search_depth="adaptive": a dict with search_path, quality_score and results (that list).
     """
-    return web_search_service.execute(query, country, max_results, search_depth, topic)
\ No newline at end of file
+    return web_search_service.execute(query, country, max_results, search_depth, topic)
+
+
+async def _web_search_tool_async(
+    query: str, 
+    country: str = "china", 
+    max_results: int = 5,
+    search_depth: Literal["adaptive", "basic", "advanced"] = "adaptive",
+    topic: Literal["general", "news"] = "general"
+) -> Union[List[Dict[str, Any]], Dict[str, Any], str]:
+    return await web_search_service.aexecute(query, country, max_results, search_depth, topic)
+
+# Non-blocking implementation used when the agent runs through ainvoke
+web_search_tool.coroutine = _web_search_tool_async
@@ -0,0 +1,197 @@
+import bisect
+import csv
+import difflib
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+DATA_PATH = Path(__file__).resolve().parent / "data" / "airports.csv"
+
+# Words that only decorate a place name ("Lahore Airport", "Beijing City")
+NOISE_WORDS = {"airport", "international", "intl", "city", "the"}
+# Informal country names -> airports they resolve to (a "country" match, never an exact city)
+COUNTRY_ALIASES = {
+    "usa": ["IAD"], "america": ["IAD"], "united states of america": ["IAD"],
+    "uk": ["LHR"], "england": ["LHR"], "britain": ["LHR"], "great britain": ["LHR"], "scotland": ["EDI"],
+    "korea": ["ICN"], "holland": ["AMS"], "czechia": ["PRG"], "fiji": ["NAN"],
+}
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, strip accents/punctuation and decorative words."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^a-z0-9 ]", " ", text.lower())
+    words = [word for word in text.split() if word not in NOISE_WORDS]
+    return " ".join(words)
+
+
+class AirportIndex:
+    """
+    In-memory index over the bundled airport dataset.
+    Resolves IATA codes, metropolitan codes (e.g. LON, NYC), city names, aliases
+    and country names (-> capital airports) with exact, prefix and fuzzy matching.
+    """
+    def __init__(self, path: Path = DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.airports = {}   # {iata: record}
+        self.metros = {}     # {metro_code: [iata, ...]}
+        self.names = {}      # {normalized name: [iata, ...]}
+        self.countries = {}  # {normalized country: [capital iata, ...]}
+        self._sorted_names = []
+
+    # --- LOADING ---
+    def load(self):
+        """Load the dataset now instead of on the first lookup (startup warm-up)."""
+        self._ensure_loaded()
+        return self
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self._add(row)
+            for alias, codes in COUNTRY_ALIASES.items():
+                self.countries.setdefault(alias, []).extend(code for code in codes if code in self.airports)
+            self._sorted_names = sorted(self.names)
+            self._loaded = True
+            logger.info(f"Airport index loaded: {len(self.airports)} airports, {len(self.metros)} metro groups")
+
+    def _add(self, row: dict):
+        code = row["iata"].strip().upper()
+        record = {
+            "iata": code,
+            "name": row["name"],
+            "city": row["city"],
+            "country": row["country"],
+            "metro": row["metro"].strip().upper() or None,
+        }
+        self.airports[code] = record
+        if record["metro"]:
+            self.metros.setdefault(record["metro"], []).append(code)
+
+        # A city name resolves to every airport serving it
+        aliases = [row["city"], *[alias for alias in row["aliases"].split(";") if alias]]
+        for alias in aliases:
+            self._add_name(normalize_place(alias), code)
+        self._add_name(normalize_place(row["name"]), code)
+        if row["capital"].strip() == "1":
+            self.countries.setdefault(normalize_place(row["country"]), []).append(code)
+
+    def _add_name(self, name: str, code: str):
+        if not name:
+            return
+        codes = self.names.setdefault(name, [])
+        if code not in codes:
+            codes.append(code)
+
+    # --- LOOKUPS ---
+    def is_known_code(self, code: str) -> bool:
+        self._ensure_loaded()
+        code = str(code).strip().upper()
+        return code in self.airports or code in self.metros
+
+    def resolve(self, query: str):
+        """
+        Resolve free text to airports.
+        Returns a dict (code, airports, city, country, match) or None when nothing matches.
+        `code` is ready for SerpAPI: one IATA code, or comma-joined codes for multi-airport cities.
+        """
+        self._ensure_loaded()
+        if not query or not str(query).strip():
+            return None
+        raw = str(query).strip()
+
+        # 1. Codes (airport before metro: "SHA" is an airport and a metro group)
+        upper = raw.upper()
+        if re.fullmatch(r"[A-Z]{3}(,[A-Z]{3})*", upper.replace(" ", "")):
+            codes = upper.replace(" ", "").split(",")
+            if all(code in self.airports for code in codes):
+                return self._result(codes, "iata")
+            if len(codes) == 1 and codes[0] in self.metros:
+                return self._result(self.metros[codes[0]], "metro")
+
+        name = normalize_place(raw)
+        if not name:
+            return None
+
+        # 2. Exact city / alias / airport name, then country -> capital
+        if name in self.names:
+            return self._result(self.names[name], "exact")
+        if name in self.countries:
+            return self._result(self.countries[name], "country")
+        if "," in raw:
+            # "Rome, Italy" -> "Rome"
+            return self.resolve(raw.split(",")[0])
+
+        # 3. Prefix that points at a single city ("islama" -> Islamabad)
+        prefix_matches = self.search(name, limit=10)
+        cities = {self._city_key(self.names[match][0]) for match in prefix_matches}
+        if len(cities) == 1:
+            return self._result(self.names[prefix_matches[0]], "prefix")
+
+        # 4. Fuzzy match for typos ("Islamabd", "Bejing")
+        fuzzy = difflib.get_close_matches(name, self._sorted_names, n=1, cutoff=0.85)
+        if fuzzy:
+            return self._result(self.names[fuzzy[0]], "fuzzy")
+        return None
+
+    def search(self, prefix: str, limit: int = 5):
+        """Return up to `limit` indexed names starting with the normalized prefix."""
+        self._ensure_loaded()
+        prefix = normalize_place(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        matches = []
+        for name in self._sorted_names[start:]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+    def suggest(self, query: str, limit: int = 3):
+        """Human-readable candidates ("Islamabad (ISB)") for an unresolvable query."""
+        self._ensure_loaded()
+        name = normalize_place(query)
+        candidates = self.search(name, limit=limit)
+        candidates += difflib.get_close_matches(name, self._sorted_names, n=limit, cutoff=0.6)
+        codes = [self.names[candidate][0] for candidate in candidates]
+        codes += difflib.get_close_matches(str(query).strip().upper(), list(self.airports), n=limit, cutoff=0.6)
+
+        suggestions = []
+        for code in codes:
+            label = f"{self.airports[code]['city']} ({code})"
+            if label not in suggestions:
+                suggestions.append(label)
+        return suggestions[:limit]
+
+    def _city_key(self, code: str):
+        return self.airports[code]["city"], self.airports[code]["country"]
+
+    def _result(self, codes, match: str):
+        # Names shared by different cities ("San Jose") resolve to the first city only
+        first = self.airports[codes[0]]
+        if match != "iata":
+            codes = [code for code in codes if self._city_key(code) == self._city_key(codes[0])]
+        return {
+            "code": ",".join(codes),
+            "airports": list(codes),
+            "city": first["city"],
+            "country": first["country"],
+            "match": match,
+        }
+
+
+# Shared instance (the dataset is loaded on first lookup)
+airport_index = AirportIndex()
@@ -0,0 +1,169 @@
+import re
+from datetime import datetime, timedelta
+
+from src.utils.airport_index import airport_index
+from src.utils.validators import date_check
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+FIELDS = ["Departure", "Destination", "StartDate", "Duration", "Budget", "Interest", "ExtraDetail"]
+
+# How each missing field is asked for in the locally generated reply
+FIELD_QUESTIONS = {
+    "Departure": "which city you are travelling from",
+    "Destination": "which city (or cities) you want to visit",
+    "StartDate": "when you want to start the trip (YYYY-MM-DD)",
+    "Duration": "how many days the trip should last",
+    "Budget": "your overall budget",
+    "Interest": "what you are interested in (food, history, nature, ...)",
+    "ExtraDetail": "any extra details I should know (or \"none\")",
+}
+
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d %B %Y", "%B %d %Y", "%d %b %Y", "%b %d %Y"]
+DATE_FORMATS_NO_YEAR = ["%d %B", "%B %d", "%d %b", "%b %d"]
+
+DURATION_PATTERN = re.compile(r"^(\d{1,3})\s*(days?|d|nights?|weeks?)$")
+BUDGET_PATTERN = re.compile(
+    r"^(?P<prefix>\$|usd|us\$|rmb|cny|¥|€|eur|£|gbp|pkr|rs\.?)?\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<k>k)?\s*"
+    r"(?P<suffix>usd|dollars?|rmb|yuan|cny|eur|euros?|gbp|pounds?|pkr|rupees?)?$"
+)
+NO_EXTRA_PATTERN = re.compile(r"^(no|none|nope|nothing|nothing else|no extra details?|that'?s all|n/?a)$")
+FROM_TO_PATTERN = re.compile(r"^from\s+(?P<departure>.+?)\s+to\s+(?P<destination>.+)$")
+SEGMENT_SPLIT = re.compile(r"\s*(?:,|;|\band\b|&)\s*")
+
+
+class RuleBasedExtractor:
+    """
+    Local, deterministic extraction for short answers ("5 days", "2026-03-03",
+    "$2000", "Islamabad"). Returns the same dict shape as InformationGatherChatbot.ask
+    when every part of the message is understood with high confidence, otherwise
+    None so the caller falls back to the LLM.
+    """
+    def __init__(self, max_chars: int = 80):
+        self.max_chars = max_chars
+
+    def extract(self, text: str, missing_list):
+        if not text or len(str(text)) > self.max_chars or not missing_list:
+            return None
+        message = " ".join(str(text).lower().strip().rstrip(".!").split())
+        values = self._from_to(message, missing_list)
+        if values is None:
+            values = self._segments(message, missing_list)
+        if not values:
+            return None
+
+        logger.info(f"Fast path filled {list(values)} without the LLM")
+        result = {field: None for field in FIELDS}
+        result.update(values)
+        result["Response"] = self._response([field for field in missing_list if field not in values])
+        return result
+
+    # --- MESSAGE SHAPES ---
+    def _from_to(self, message, missing_list):
+        match = FROM_TO_PATTERN.match(message)
+        if not match or "Departure" not in missing_list or "Destination" not in missing_list:
+            return None
+        departure = self._city(match.group("departure"))
+        destinations = [self._city(part) for part in SEGMENT_SPLIT.split(match.group("destination")) if part]
+        if not departure or not destinations or not all(destinations):
+            return {}
+        return {"Departure": departure, "Destination": destinations}
+
+    def _segments(self, message, missing_list):
+        """Every comma/"and"-separated part must fill a different missing field."""
+        segments = [segment for segment in SEGMENT_SPLIT.split(message) if segment]
+        values, cities = {}, []
+        for segment in segments:
+            parsed = self._parse_segment(segment, missing_list)
+            if parsed is None:
+                return None
+            field, value = parsed
+            if field == "city":
+                cities.append(value)
+            elif field in values:
+                return None
+            else:
+                values[field] = value
+
+        if cities:
+            # A bare city only answers one of Departure / Destination when the other is known
+            if "Destination" in missing_list and "Departure" not in missing_list:
+                values["Destination"] = cities
+            elif "Departure" in missing_list and "Destination" not in missing_list and len(cities) == 1:
+                values["Departure"] = cities[0]
+            else:
+                return None
+        return values
+
+    def _parse_segment(self, segment, missing_list):
+        """(field, value) for a fully understood segment, else None."""
+        if "StartDate" in missing_list:
+            date = self._date(segment)
+            if date:
+                return "StartDate", date
+        duration = DURATION_PATTERN.match(segment)
+        if duration and "Duration" in missing_list:
+            days = int(duration.group(1)) * (7 if duration.group(2).startswith("week") else 1)
+            return "Duration", str(days)
+        budget = BUDGET_PATTERN.match(segment)
+        has_currency = bool(budget and (budget.group("prefix") or budget.group("suffix") or budget.group("k")))
+        if budget and "Budget" in missing_list:
+            # A bare number is only a budget when the duration is not being asked for too
+            if has_currency or "Duration" not in missing_list:
+                return "Budget", segment
+        if budget and not has_currency and "Duration" in missing_list and "Budget" not in missing_list:
+            return "Duration", budget.group("amount")
+        if NO_EXTRA_PATTERN.match(segment) and "ExtraDetail" in missing_list:
+            return "ExtraDetail", ["No extra details"]
+        city = self._city(segment)
+        if city and ("Departure" in missing_list or "Destination" in missing_list):
+            return "city", city
+        return None
+
+    # --- VALUE PARSERS ---
+    def _date(self, segment):
+        today = datetime.now().date()
+        if segment == "today":
+            return today.isoformat()
+        if segment == "tomorrow":
+            return (today + timedelta(days=1)).isoformat()
+
+        cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", segment).replace(",", " ")
+        cleaned = " ".join(cleaned.split())
+        for date_format in DATE_FORMATS:
+            try:
+                value = datetime.strptime(cleaned, date_format).date().isoformat()
+            except ValueError:
+                continue
+            return value if date_check(value) else None
+        for date_format in DATE_FORMATS_NO_YEAR:
+            try:
+                parsed = datetime.strptime(f"{cleaned} {today.year}", f"{date_format} %Y").date()
+            except ValueError:
+                continue
+            # "March 3" means the next March 3rd
+            if parsed < today:
+                parsed = parsed.replace(year=today.year + 1)
+            return parsed.isoformat()
+        return None
+
+    def _city(self, segment):
+        resolution = airport_index.resolve(segment)
+        # Only exact city/airport names: codes collide with words ("yes", "fun") and
+        # countries or fuzzy guesses are left to the LLM (it asks for a city)
+        if resolution and resolution["match"] == "exact":
+            return resolution["city"]
+        return None
+
+    def _response(self, still_missing) -> str:
+        if not still_missing:
+            return "Perfect, I have everything I need. Let me start planning your trip!"
+        questions = [FIELD_QUESTIONS[field] for field in still_missing]
+        if len(questions) == 1:
+            return f"Got it! Could you also tell me {questions[0]}?"
+        return f"Got it! Could you also tell me {', '.join(questions[:-1])} and {questions[-1]}?"
+
+
+# Shared instance used by the gather-info node
+rule_extractor = RuleBasedExtractor()
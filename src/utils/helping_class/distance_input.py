@@ -1,7 +1,17 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
 class DistanceInput(BaseModel):
     origins: str = Field(..., description="The starting location (e.g., 'New York, NY').")
     destinations: str = Field(..., description="The destination location (e.g., 'Boston, MA').")
-    mode: str = Field("walking", description="Mode of travel: 'walking', 'driving', 'bicycling', or 'transit'.")
\ No newline at end of file
+    mode: str = Field("walking", description="Mode of travel: 'walking', 'driving', 'bicycling', or 'transit'.")
+    approximate: bool = Field(False, description="True for a fast local estimate instead of an exact Google Maps route.")
+
+
+class DistanceBatchInput(BaseModel):
+    origins: List[str] = Field(..., description="Starting locations, e.g. the assigned hotels (['Hotel A, Islamabad']).")
+    destinations: List[str] = Field(..., description="Places to measure to from every origin, e.g. all attractions and restaurants.")
+    mode: str = Field("walking", description="Mode of travel: 'walking', 'driving', 'bicycling', or 'transit'.")
+    approximate: bool = Field(False, description="True for a fast local estimate instead of an exact Google Maps route.")
@@ -0,0 +1,20 @@
+from typing import List, TypedDict
+
+
+class FlightOption(TypedDict, total=False):
+    """One priced flight option of a route leg (cheapest first per leg)."""
+    leg: str              # "PEK -> ISB"
+    date: str             # YYYY-MM-DD
+    price: float
+    hours: float          # total flight duration
+    layovers: List[str]
+    price_level: str      # SerpAPI price insight for the leg ("low", "typical", "high")
+
+
+class PlaceRecord(TypedDict, total=False):
+    """A hotel, restaurant or attraction with its TripAdvisor rating."""
+    city: str
+    category: str         # "hotels", "restaurants" or "attractions"
+    title: str
+    rating: float
+    description: str
@@ -2,6 +2,8 @@ from typing import List
 from pydantic import Field
 from langchain.agents import AgentState
 
+from src.utils.helping_class.trip_records import FlightOption, PlaceRecord
+
 class CustomState(AgentState):
     Departure: str = None
     Destination: List['str'] = Field(None, description = "The place you want to go")
@@ -14,6 +16,9 @@ class CustomState(AgentState):
     Response: str = Field(None, description = "The response of Model")
     move_to_info_chatbot: bool = Field(False, description = "")
     previous_plan: str = None
+    plan_sections: List[dict] = Field(None, description = "previous_plan split into addressable sections (id, title, text) for section-level revisions")
     TravelMode: str = Field("Travel_Plan", description = "When you want plan from scratch, it is Travel_Plan and for Revision_Plan")
     flight_info: str = None
-    hotel_info: str = None
\ No newline at end of file
+    hotel_info: str = None
+    flight_options: List[FlightOption] = Field(None, description = "Structured flight options from the direct route search")
+    places: List[PlaceRecord] = Field(None, description = "Structured hotels, restaurants and attractions per city")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config.settings import settings
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+
+class HttpTransport:
+    """
+    Shared HTTP layer for every external API client.
+    One requests.Session with pooled keep-alive connections (pool size per host),
+    (connect, read) timeouts and proxies from settings, and retries on transient
+    gateway errors. googlemaps reuses the session itself; Tavily gets its own session on
+    the same connection pool (client_session()) because it writes its API key into the
+    session headers.
+    """
+    def __init__(
+        self,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_retries: int = None,
+    ):
+        self.pool_connections = pool_connections or settings.http_pool_connections
+        self.pool_maxsize = pool_maxsize or settings.http_pool_maxsize
+        self.connect_timeout = connect_timeout or settings.http_connect_timeout or settings.request_timeout
+        self.read_timeout = read_timeout or settings.http_read_timeout or settings.request_timeout
+        self.max_retries = max_retries if max_retries is not None else settings.http_max_retries
+        self._lock = threading.Lock()
+        self._session = None
+        self._adapter = None
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def proxies(self) -> dict:
+        proxies = {}
+        if settings.http_proxy:
+            proxies["http"] = settings.http_proxy
+        if settings.https_proxy:
+            proxies["https"] = settings.https_proxy
+        return proxies
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def client_session(self) -> requests.Session:
+        """
+        A separate session for an SDK client (headers stay private to it), mounted on the
+        shared adapter so its connections still come from the same keep-alive pool.
+        """
+        self.session  # builds the shared adapter on first use
+        session = requests.Session()
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        session.proxies.update(self.proxies)
+        return session
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        session.proxies.update(self.proxies)
+        logger.info(f"HTTP session ready (pool {self.pool_connections}x{self.pool_maxsize}, timeout {self.timeout})")
+        return session
+
+    # --- REQUESTS ---
+    def get_json(self, url: str, params: dict = None) -> dict:
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        return response.json()
+
+    def serpapi_search(self, params: dict) -> dict:
+        """
+        Same result as serpapi.GoogleSearch(params).get_dict(), over the pooled session.
+        API errors come back as {"error": ...} just like the SDK.
+        """
+        return self.get_json(SERPAPI_URL, params={**params, "output": "json", "source": "python"})
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                self._adapter = None
+
+
+# Shared instance used by every tool
+http_transport = HttpTransport()
@@ -0,0 +1,71 @@
+import copy
+import threading
+
+from src.config.settings import settings
+from src.database.response_cache import ResponseCache
+from src.logging.logging import setup_logger
+
+logger = setup_logger(__file__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait and receive the same result (or exception). Nothing is kept once
+    the call finishes - persistence is the ResponseCache's job.
+    """
+    def __init__(self, enabled: bool = None):
+        self.enabled = settings.enable_request_coalescing if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._calls = {}  # {key: _Call}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    def do(self, key: str, fn):
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["executed"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            logger.info(f"Coalesced in-flight call: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Waiters get their own copy so nobody mutates a shared dict
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
+
+
+# Shared instance used by the lookup services
+single_flight = SingleFlight()
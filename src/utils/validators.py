@@ -1,6 +1,8 @@
 import re
 from datetime import datetime
 
+from src.utils.airport_index import airport_index
+
 def flight_code_check(input: str):
     "This validator is used to check the flight code"
     pattern = r'^[A-Z]{3}$'
@@ -8,14 +10,23 @@ def flight_code_check(input: str):
         return False
     return True
 
+def airport_code_check(input: str, strict: bool = False):
+    "Checks one or more comma separated IATA codes; strict also requires them to be in the bundled airport index"
+    codes = [code.strip() for code in input.split(",")]
+    if not all(code and flight_code_check(code) for code in codes):
+        return False
+    if strict and not all(airport_index.is_known_code(code) for code in codes):
+        return False
+    return True
+
 def date_check(date: str):
+    "YYYY-MM-DD dates from today on; only the full date is compared (no separate year/month checks), impossible dates are rejected"
     pattern = r'\d{4}-\d{2}-\d{2}$'
     if not re.match(pattern, date):
         return False
-    date_stripped = datetime.strptime(date, "%Y-%m-%d")
-    if date_stripped.year < datetime.now().year:
-        return False
-    if date_stripped.month < datetime.now().month:
+    try:
+        date_stripped = datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
         return False
     if date_stripped.date() < datetime.now().date():
         return False
@@ -0,0 +1,89 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Run from the project root: python testing/startup_benchmark.py
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# Imported in dependency order, so each row is the extra time that module adds
+MODULES = [
+    "src.config.settings",
+    "src.logging.logging",
+    "src.logging.tracing",
+    "src.database.response_cache",
+    "src.database.checkpointer",
+    "src.utils.http.transport",
+    "src.utils.airport_index",
+    "src.tools.flight_search_tool",
+    "src.tools.hotel_tool",
+    "src.tools.restaurant_tool",
+    "src.tools.attraction_finding_tool",
+    "src.tools.city_profile_tool",
+    "src.tools.distance_measurement_tool",
+    "src.tools.web_search_tool",
+    "src.agents.info_gather_agent",
+    "src.agents.flight_search_agent",
+    "src.agents.destination_info_agent",
+    "src.agents.final_trip_planner_agent",
+    "src.model_service.model_service",
+]
+
+
+def measure(lazy: bool) -> dict:
+    """Runs in a fresh interpreter (see main) so nothing is imported yet."""
+    os.environ["LAZY_STARTUP"] = "true" if lazy else "false"
+    imports = {}
+    for module in MODULES:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        imports[module] = time.perf_counter() - start
+
+    from src.model_service.model_service import get_trip_system
+
+    start = time.perf_counter()
+    trip_system = get_trip_system()
+    construct = time.perf_counter() - start
+
+    # Lazy mode pays this on the first request instead of at startup
+    start = time.perf_counter()
+    warm_up = trip_system.warm_up()
+    first_use = time.perf_counter() - start
+    return {"imports": imports, "construct": construct, "warm_up": warm_up, "first_use": first_use}
+
+
+def report(mode: str, result: dict):
+    total_imports = sum(result["imports"].values())
+    print(f"\n=== {mode} startup ===")
+    print(f"{'module':<45} {'import (ms)':>12}")
+    for module, seconds in result["imports"].items():
+        print(f"{module:<45} {seconds * 1000:>12.1f}")
+    print(f"{'total imports':<45} {total_imports * 1000:>12.1f}")
+    print(f"{'get_trip_system()':<45} {result['construct'] * 1000:>12.1f}")
+    print(f"{'time-to-ready':<45} {(total_imports + result['construct']) * 1000:>12.1f}")
+    print("warm-up steps (ms): " + ", ".join(f"{step}={seconds * 1000:.1f}" for step, seconds in result["warm_up"].items()))
+    print(f"{'deferred to first request':<45} {result['first_use'] * 1000:>12.1f}")
+
+
+def main():
+    for mode, lazy in [("lazy", True), ("eager", False)]:
+        # A fresh interpreter per mode, so module import times are not shared
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "lazy" if lazy else "eager"],
+            capture_output=True, text=True, cwd=project_root,
+        )
+        if output.returncode != 0:
+            print(f"❌ {mode} run failed:\n{output.stderr}")
+            continue
+        report(mode, json.loads(output.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        result = measure(lazy=sys.argv[2] == "lazy")
+        print(json.dumps(result))
+    else:
+        main()
@@ -24,6 +24,7 @@ async def chat():
                 payload = json.dumps({"user_id": "test_user_1", "input": user_input})
                 await websocket.send(payload)
                 
+                streaming = False
                 while True:
                     response = await websocket.recv()
                     data = json.loads(response)
@@ -37,8 +38,17 @@ async def chat():
                     elif msg_type == "UPDATE":
                         print(f" ℹ️  {content}")
                     
+                    elif msg_type == "CHUNK":
+                        if not streaming:
+                            print("\n🤖 AI: ", end="")
+                            streaming = True
+                        print(content, end="", flush=True)
+                    
                     elif msg_type == "RESPONSE":
-                        print(f"\n🤖 AI: {content}\n")
+                        if streaming:
+                            print("\n")  # already printed token by token
+                        else:
+                            print(f"\n🤖 AI: {content}\n")
                     
                     elif msg_type == "DONE":
                         break
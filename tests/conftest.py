@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings requires the API keys; the unit tests never call the external APIs
+for key in ["GOOGLE_PLACES_KEY", "GOOGLE_API_KEY", "TAVILY_API_KEY", "SERPAPI_KEY"]:
+    os.environ.setdefault(key, "test-key")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
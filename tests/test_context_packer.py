@@ -0,0 +1,50 @@
+from src.model_service.context_packer import ContextPacker
+
+
+def _plan(days: int) -> str:
+    return "\n".join(f"**Day {day}**\n* **Morning:** Visit **Place {day}** and walk around the old town." for day in range(1, days + 1))
+
+
+def test_everything_fits_within_budget():
+    packer = ContextPacker(token_budget=1000)
+    packed = packer.pack([
+        {"name": "trip", "title": "TRIP", "priority": 0, "content": {"To": "Islamabad", "Budget": None}},
+        {"name": "notes", "title": "NOTES", "priority": 1, "content": "**Bold** line\nSure! here you go\nBold line"},
+    ], footer="Task: plan.")
+    assert "- To: Islamabad" in packed["prompt"]
+    assert "Budget" not in packed["prompt"]
+    # Markdown, filler and the duplicate line are compacted away
+    assert "NOTES:\nBold line\n\nTask: plan." in packed["prompt"]
+
+
+def test_lower_priority_sections_are_trimmed_to_the_budget():
+    packer = ContextPacker(token_budget=120, max_line_chars=80)
+    packed = packer.pack([
+        {"name": "trip", "title": "TRIP", "priority": 0, "content": "Islamabad for 5 days"},
+        {"name": "small", "title": "SMALL", "priority": 1, "content": "one short line"},
+        {"name": "large", "title": "LARGE", "priority": 1, "content": "\n".join(f"hotel number {i} with a view" for i in range(100))},
+    ])
+    assert packed["tokens"] <= 120
+    assert "one short line" in packed["prompt"]
+    assert "more lines omitted" in packed["prompt"]
+    assert "Islamabad for 5 days" in packed["prompt"]
+
+
+def test_records_render_as_a_table():
+    packer = ContextPacker(token_budget=1000)
+    packed = packer.pack([{"name": "places", "title": "PLACES", "priority": 1, "content": [
+        {"title": "Faisal Mosque", "rating": 4.8}, {"title": "Monal", "rating": 4.5},
+    ]}])
+    assert "title | rating\nFaisal Mosque | 4.8\nMonal | 4.5" in packed["prompt"]
+
+
+def test_verbatim_plan_is_never_trimmed():
+    plan = _plan(10)
+    packer = ContextPacker(token_budget=100)
+    packed = packer.pack([
+        {"name": "concern", "title": "CONCERN", "priority": 0, "content": "change day 2"},
+        {"name": "previous_plan", "title": "PREVIOUS PLAN", "priority": 1, "content": plan, "verbatim": True},
+        {"name": "places", "title": "PLACES", "priority": 2, "content": "\n".join(f"place {i}" for i in range(50))},
+    ])
+    assert plan in packed["prompt"]
+    assert "PLACES" not in packed["prompt"]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from src.model_service.context_packer import ContextPacker
+from src.model_service.day_planner import ParallelDayPlanner
+
+
+def _state(duration="5"):
+    places = []
+    for city in ["Islamabad", "Karachi"]:
+        places.append({"city": city, "category": "hotels", "title": f"Hotel {city}", "rating": 4.5})
+        for index in range(6):
+            places.append({"city": city, "category": "attractions", "title": f"Sight {index} {city}", "rating": 4.0})
+            places.append({"city": city, "category": "restaurants", "title": f"Food {index} {city}", "rating": 4.0})
+    return {"TravelMode": "Travel_Plan", "Destination": ["Islamabad", "Karachi"], "StartDate": "2099-01-30",
+            "Duration": duration, "places": places}
+
+
+def _generate(kind, prompt):
+    if kind == "header":
+        return "**TITLE: Trip**\n\n#### 1. Logistics Snapshot\n* **Flight:** CA\n\n#### 3. Itinerary\n**Day 1**\nwrong"
+    day = prompt.split("Task: Write Day ")[1].split(" ")[0]
+    # Slower early days: completion order differs from day order
+    time.sleep(0.05 / int(day))
+    return f"Sure!\n**Day {day}: Fun**\n* **Morning:** Visit **Sight**."
+
+
+def test_skeleton_assigns_each_place_once_in_travel_order():
+    skeleton = ParallelDayPlanner(ContextPacker()).skeleton(_state())
+    assert [(day["day"], day["city"], day["date"]) for day in skeleton] == [
+        (1, "Islamabad", "2099-01-30"), (2, "Islamabad", "2099-01-31"), (3, "Islamabad", "2099-02-01"),
+        (4, "Karachi", "2099-02-02"), (5, "Karachi", "2099-02-03"),
+    ]
+    titles = [place["title"] for day in skeleton for place in day["attractions"] + day["restaurants"]]
+    assert len(titles) == len(set(titles))
+    assert all(day["hotel"] == f"Hotel {day['city']}" for day in skeleton)
+
+
+def test_applies_only_to_long_fresh_plans_with_places():
+    planner = ParallelDayPlanner(ContextPacker(), min_days=3)
+    assert planner.applies(_state())
+    assert not planner.applies(_state(duration="2"))
+    assert not planner.applies({**_state(), "places": []})
+    assert not planner.applies({**_state(), "TravelMode": "Revision_Plan"})
+
+
+def test_plan_streams_parts_in_day_order():
+    planner = ParallelDayPlanner(ContextPacker(), max_concurrency=6)
+    parts = []
+    plan = planner.plan(_state(), _generate, on_part=parts.append)
+    assert "".join(parts) == plan
+    assert parts[0] == "**TITLE: Trip**\n\n#### 1. Logistics Snapshot\n* **Flight:** CA\n\n#### 3. Itinerary\n\n"
+    assert [part.split("**")[1] for part in parts[1:]] == [f"Day {day}" for day in range(1, 6)]
+    assert "wrong" not in plan and "Sure!" not in plan
+
+
+def test_async_plan_matches_sync_plan():
+    planner = ParallelDayPlanner(ContextPacker(), max_concurrency=2)
+    parts = []
+
+    async def agenerate(kind, prompt):
+        return _generate(kind, prompt)
+
+    async def on_part(text):
+        parts.append(text)
+
+    plan = asyncio.run(planner.aplan(_state(), agenerate, on_part=on_part))
+    assert plan == "".join(parts) == planner.plan(_state(), _generate)
+
+
+def test_durations_beyond_the_max_use_the_single_call_planner(monkeypatch):
+    from src.config.settings import settings
+    monkeypatch.setattr(settings, "parallel_planning_max_days", 30)
+    planner = ParallelDayPlanner(ContextPacker(), min_days=3)
+    assert planner.days(_state(duration="45")) == 45
+    assert not planner.applies(_state(duration="45"))
+    assert planner.applies(_state(duration="30"))
+
+
+def test_more_cities_than_days_use_the_single_call_planner():
+    planner = ParallelDayPlanner(ContextPacker(), min_days=3)
+    state = {**_state(duration="3"), "Destination": ["Islamabad", "Karachi", "Lahore", "Skardu"]}
+    assert not planner.applies(state)
+    assert planner.applies({**state, "Destination": ["Islamabad", "Karachi", "Lahore"]})
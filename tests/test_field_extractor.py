@@ -0,0 +1,75 @@
+import pytest
+
+from src.utils.field_extractor import RuleBasedExtractor
+
+
+@pytest.fixture
+def extractor():
+    return RuleBasedExtractor()
+
+
+def test_bare_number_answers_duration_when_budget_is_known(extractor):
+    result = extractor.extract("5", ["Duration"])
+    assert result["Duration"] == "5"
+
+
+def test_bare_number_answers_budget_when_duration_is_known(extractor):
+    result = extractor.extract("2000", ["Budget"])
+    assert result["Budget"] == "2000"
+
+
+def test_bare_number_is_ambiguous_when_both_are_missing(extractor):
+    assert extractor.extract("5", ["Duration", "Budget"]) is None
+
+
+@pytest.mark.parametrize("text", ["$2000", "2000 usd", "2k", "rs. 150000"])
+def test_currency_marks_a_budget(extractor, text):
+    result = extractor.extract(text, ["Duration", "Budget"])
+    assert result["Budget"] == text
+    assert result["Duration"] is None
+
+
+def test_multi_field_reply(extractor):
+    result = extractor.extract("5 days, $2000 and none", ["Duration", "Budget", "ExtraDetail", "Interest"])
+    assert result["Duration"] == "5"
+    assert result["Budget"] == "$2000"
+    assert result["ExtraDetail"] == ["No extra details"]
+    assert "interested in" in result["Response"]
+
+
+def test_weeks_are_converted_to_days(extractor):
+    assert extractor.extract("2 weeks", ["Duration"])["Duration"] == "14"
+
+
+def test_from_to_reply(extractor):
+    result = extractor.extract("from beijing to islamabad and lahore", ["Departure", "Destination"])
+    assert result["Departure"] == "Beijing"
+    assert result["Destination"] == ["Islamabad", "Lahore"]
+
+
+def test_repeated_field_falls_back_to_llm(extractor):
+    assert extractor.extract("5 days and 6 days", ["Duration"]) is None
+
+
+def test_free_text_falls_back_to_llm(extractor):
+    assert extractor.extract("i want something fun", ["Interest"]) is None
+
+
+def test_fast_path_falls_back_to_llm_on_extractor_errors(monkeypatch):
+    from src.model_service import model_service
+
+    def broken(text, missing_list):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(model_service.rule_extractor, "extract", broken)
+    system = object.__new__(model_service.TravelAutomationSystem)
+    assert system._fast_path("5", ["Duration"]) is None
+
+
+@pytest.mark.parametrize("text", ["usa", "uk", "england", "america", "korea"])
+def test_country_names_fall_back_to_llm(extractor, text):
+    assert extractor.extract(text, ["Destination", "Duration"]) is None
+
+
+def test_exact_city_fills_destination(extractor):
+    assert extractor.extract("seoul", ["Destination", "Duration"])["Destination"] == ["Seoul"]
@@ -0,0 +1,14 @@
+from src.tools.flight_search_tool import route_planner
+
+
+def test_names_and_codes_of_one_place_are_one_stop():
+    legs = route_planner.plan_legs("Beijing", ["Islamabad", "ISB", "Karachi", "KHI"])
+    assert legs == [("PEK,PKX", "ISB"), ("PEK,PKX", "KHI"), ("ISB", "KHI"), ("KHI", "ISB")]
+
+
+def test_destination_in_the_departure_city_is_skipped():
+    assert route_planner.plan_legs("PEK", ["Beijing", "Islamabad"]) == [("PEK", "ISB")]
+
+
+def test_unknown_places_are_kept_as_given():
+    assert route_planner.plan_legs("LHE", ["xyzq"]) == [("LHE", "XYZQ")]
@@ -0,0 +1,26 @@
+from src.tools.distance_measurement_tool import GeocodeIndex
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def geocode(self, place):
+        self.calls.append(place)
+        return [{"geometry": {"location": {"lat": float(len(self.calls)), "lng": 0.0}}}]
+
+
+def test_memory_is_capped_least_recently_used_first(monkeypatch):
+    from src.database import response_cache as cache_module
+    # Bypass the persistent cache: every miss goes to the client
+    monkeypatch.setattr(cache_module.response_cache, "get_or_fetch", lambda namespace, key, fetch, **kwargs: fetch())
+    client = FakeClient()
+    index = GeocodeIndex(lambda: client, max_entries=2)
+    index.lookup("Faisal Mosque")
+    index.lookup("Monal")
+    index.lookup("Faisal Mosque")   # refreshes Faisal Mosque
+    index.lookup("Lok Virsa")       # evicts Monal
+    assert len(index._memory) == 2
+    index.lookup("Faisal Mosque")
+    index.lookup("Monal")
+    assert client.calls == ["Faisal Mosque", "Monal", "Lok Virsa", "Monal"]
@@ -0,0 +1,27 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.model_service.history_compactor import HistoryCompactor
+
+
+def _messages(count: int) -> list:
+    return [(HumanMessage if index % 2 == 0 else AIMessage)(content=f"message {index}", id=str(index)) for index in range(count)]
+
+
+def test_compact_keeps_the_last_messages_and_summarizes_the_rest():
+    compactor = HistoryCompactor(keep_messages=4, mode="summarize")
+    update = compactor.compact(_messages(10), thread_id="u1")
+    kept = update["messages"][1:]
+    assert "message 0" in kept[0].content
+    assert [message.content for message in kept[1:]] == ["message 6", "message 7", "message 8", "message 9"]
+    assert compactor.stats("u1")["messages_removed"] == 6
+
+
+def test_short_threads_are_left_alone():
+    assert HistoryCompactor(keep_messages=4).compact(_messages(3), thread_id="u1") == {}
+
+
+def test_stats_keep_only_the_most_recent_threads():
+    compactor = HistoryCompactor(keep_messages=2, max_stats_threads=2)
+    for thread_id in ["u1", "u2", "u1", "u3"]:
+        compactor.compact(_messages(5), thread_id=thread_id)
+    assert list(compactor.stats()) == ["u1", "u3"]
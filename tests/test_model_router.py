@@ -0,0 +1,20 @@
+from src.config.settings import settings
+from src.model_service.model_router import ModelRouter
+
+
+def test_day_planning_tiers_follow_the_itinerary_tier(monkeypatch):
+    monkeypatch.setattr(settings, "itinerary_model_tier", "pro")
+    monkeypatch.setattr(settings, "itinerary_header_model_tier", None)
+    monkeypatch.setattr(settings, "itinerary_day_model_tier", "fast")
+    router = ModelRouter()
+    assert router.choose("itinerary_header") == "pro"
+    assert router.choose("itinerary_day") == "fast"
+
+
+def test_auto_scores_fresh_multi_city_plans_as_pro(monkeypatch):
+    monkeypatch.setattr(settings, "itinerary_model_tier", "auto")
+    monkeypatch.setattr(settings, "itinerary_day_model_tier", None)
+    monkeypatch.setattr(settings, "route_pro_min_score", 2)
+    router = ModelRouter()
+    assert router.choose("itinerary_day", destinations=2) == "pro"
+    assert router.choose("itinerary_day", destinations=1, revision=True) == "fast"
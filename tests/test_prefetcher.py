@@ -0,0 +1,45 @@
+import time
+
+from src.model_service.prefetcher import Prefetcher
+
+
+def test_take_returns_result_for_same_key_and_drops_thread():
+    prefetcher = Prefetcher(max_workers=2, wait_seconds=5)
+    prefetcher.submit("u1", "flights", ("PEK", "ISB"), lambda: {"status": "Success"})
+    assert prefetcher.take("u1", "flights", ("PEK", "ISB")) == {"status": "Success"}
+    assert prefetcher.stats()["threads"] == 0
+
+
+def test_take_with_other_key_is_a_miss():
+    prefetcher = Prefetcher(max_workers=2, wait_seconds=5)
+    prefetcher.submit("u1", "flights", ("PEK", "ISB"), lambda: "old")
+    assert prefetcher.take("u1", "flights", ("PEK", "KHI")) is None
+    assert prefetcher.stats()["threads"] == 0
+
+
+def test_discard_forgets_the_thread():
+    prefetcher = Prefetcher(max_workers=2, wait_seconds=5)
+    prefetcher.submit("u1", "flights", "a", lambda: "x")
+    prefetcher.submit("u1", "destinations", "b", lambda: "y")
+    prefetcher.discard("u1")
+    assert prefetcher.stats()["threads"] == 0
+    assert prefetcher.take("u1", "flights", "a") is None
+
+
+def test_idle_threads_expire_after_ttl():
+    prefetcher = Prefetcher(max_workers=2, wait_seconds=5, ttl_seconds=0.05)
+    prefetcher.submit("u1", "flights", "a", lambda: "x")
+    time.sleep(0.1)
+    prefetcher.submit("u2", "flights", "a", lambda: "x")
+    stats = prefetcher.stats()
+    assert stats["threads"] == 1
+    assert stats["evicted"] == 1
+
+
+def test_oldest_threads_evicted_beyond_max_threads():
+    prefetcher = Prefetcher(max_workers=2, wait_seconds=5, max_threads=2)
+    for thread_id in ["u1", "u2", "u3"]:
+        prefetcher.submit(thread_id, "flights", "a", lambda: "x")
+    assert prefetcher.stats()["threads"] == 2
+    assert prefetcher.take("u1", "flights", "a") is None
+    assert prefetcher.take("u3", "flights", "a") == "x"
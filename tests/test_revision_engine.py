@@ -0,0 +1,60 @@
+from src.model_service.revision_engine import RevisionEngine
+
+PLAN = """**TITLE: 3 Day Trip to Islamabad**
+
+#### 1. Logistics Snapshot
+* **Flight:** CA | $500
+* **Accommodation:** Serena Hotel
+
+#### 3. Itinerary
+**Day 1**
+* **Morning:** Visit **Faisal Mosque**.
+* **Dinner:** Dine at **Monal**.
+
+**Day 2**
+* **Morning:** Visit **Lok Virsa Museum**.
+
+**Day 3**
+* **Morning:** Visit **Daman-e-Koh**.
+"""
+
+
+def test_split_and_join_round_trip():
+    engine = RevisionEngine()
+    sections = engine.split(PLAN)
+    assert [section["id"] for section in sections] == ["preamble", "logistics", "itinerary", "day_1", "day_2", "day_3"]
+    assert engine.join(sections) == PLAN
+
+
+def test_targets_days_blocks_and_place_names():
+    engine = RevisionEngine(max_sections=3)
+    sections = engine.split(PLAN)
+    assert engine.targets("make the second day more relaxed", sections) == ["day_2"]
+    assert engine.targets("replace Monal with something cheaper", sections) == ["day_1"]
+    assert engine.targets("find a cheaper flight", sections) == ["logistics"]
+    # Hotel changes and whole-plan requests regenerate everything
+    assert engine.targets("change the hotel", sections) is None
+    assert engine.targets("redo the entire plan", sections) is None
+
+
+def test_splice_replaces_only_the_revised_section():
+    engine = RevisionEngine()
+    sections = engine.split(PLAN)
+    response = "=== SECTION day_2 ===\n**Day 2**\n* **Morning:** Visit **Pakistan Monument**.\n"
+    revised = engine.parse_revision(response, ["day_2"])
+    plan = engine.join(engine.splice(sections, revised))
+    assert "Pakistan Monument" in plan
+    assert "Lok Virsa Museum" not in plan
+    # Untouched sections and the spacing between sections are kept
+    assert plan.replace("Pakistan Monument", "Lok Virsa Museum") == PLAN
+
+
+def test_parse_revision_rejects_missing_sections():
+    engine = RevisionEngine()
+    assert engine.parse_revision("=== SECTION day_1 ===\n**Day 1**\n", ["day_1", "day_2"]) is None
+
+
+def test_names_outside_skip_slot_labels_and_revised_days():
+    engine = RevisionEngine()
+    sections = engine.split(PLAN)
+    assert engine.names_outside(sections, ["day_1"]) == ["Lok Virsa Museum", "Daman-e-Koh"]
@@ -0,0 +1,22 @@
+from datetime import date, timedelta
+
+from src.utils.validators import date_check
+
+
+def test_today_and_future_dates_are_valid():
+    assert date_check(date.today().isoformat())
+    assert date_check((date.today() + timedelta(days=1)).isoformat())
+
+
+def test_next_year_with_an_earlier_month_is_valid():
+    # The former month check rejected e.g. January next year whenever the current month was later
+    assert date_check(date(date.today().year + 1, 1, 15).isoformat())
+
+
+def test_past_dates_are_rejected():
+    assert not date_check((date.today() - timedelta(days=1)).isoformat())
+
+
+def test_malformed_and_impossible_dates_are_rejected():
+    assert not date_check("15-01-2099")
+    assert not date_check("2099-02-30")